@@ -0,0 +1,294 @@
+"""Banc d'essai de FinTrack AI sur des historiques synthétiques.
+
+Génère des données réalistes (plusieurs comptes, catégories et récurrences)
+de 10k, 100k et 1M de transactions, chronomètre les opérations des
+gestionnaires puis, si un affichage est disponible (ou si Xvfb peut en
+fournir un virtuel), celles de l'interface. Chaque exécution ajoute une
+ligne JSON à `bench_results.jsonl` pour comparer les exécutions entre elles :
+
+    python benchmark.py --sizes 10000 100000 --repeat 3
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import datetime
+import fintrack_core
+from fintrack_core import (AccountManager, BudgetManager, RecurringManager, TransactionManager,
+                           RecurringScheduler, DataManager, JsonStorage, get_app_data_path)
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+ACCOUNTS = ["Compte Courant", "Épargne", "Livret A", "Compte Joint"]
+# (catégorie, poids, montant médian en euros)
+CATEGORIES = [("Alimentation", 30, 35), ("Transport", 15, 20), ("Loisirs", 12, 45), ("Factures", 10, 90),
+              ("Santé", 5, 40), ("Éducation", 3, 120), ("Salaire", 5, 2200), ("Autres", 20, 25)]
+DESCRIPTIONS = {"Alimentation": ["Supermarché", "Boulangerie", "Marché", "Restaurant"],
+                "Transport": ["Essence", "Navigo", "Péage", "Taxi"],
+                "Loisirs": ["Cinéma", "Concert", "Livres", "Abonnement streaming"],
+                "Factures": ["Électricité", "Internet", "Téléphone", "Assurance"],
+                "Santé": ["Pharmacie", "Médecin", "Dentiste"], "Éducation": ["Formation", "Fournitures"],
+                "Salaire": ["Salaire", "Prime"], "Autres": ["Virement", "Cadeau", "Divers"]}
+OPERATION_SAMPLES = 200
+
+# ==============================================================================
+# 1. GÉNÉRATION DES DONNÉES SYNTHÉTIQUES
+# ==============================================================================
+
+def generate_transactions(size, seed=0, days_per_thousand=4, today=None):
+    """`size` transactions réparties sur une période proportionnelle au volume (au moins un an)."""
+    rng = random.Random(seed)
+    today = today or datetime.date.today()
+    span = max(365, size * days_per_thousand // 1000)
+    names, weights, medians = zip(*CATEGORIES)
+    categories = rng.choices(names, weights=weights, k=size)
+    transactions = []
+    for i, category in enumerate(categories):
+        date = today - datetime.timedelta(days=rng.randrange(span))
+        amount = round(medians[names.index(category)] * rng.lognormvariate(0, 0.5), 2)
+        transactions.append({
+            'id': f"bench_{seed}_{i}",
+            "date": date.strftime('%d-%m-%Y'),
+            "description": rng.choice(DESCRIPTIONS[category]),
+            "amount": f"{amount:.2f}",
+            "category": category,
+            "account": rng.choice(ACCOUNTS),
+        })
+    transactions.sort(key=lambda t: (t['date'][6:], t['date'][3:5], t['date'][:2]), reverse=True)
+    return transactions
+
+def generate_recurring(count=24, seed=0, today=None):
+    """Récurrences dont l'échéance est passée de quelques semaines à un an : le rattrapage a du travail."""
+    rng = random.Random(seed)
+    today = today or datetime.date.today()
+    frequencies = list(RecurringScheduler.FREQUENCIES)
+    recurring = []
+    for i in range(count):
+        category = rng.choice(["Factures", "Salaire", "Loisirs", "Transport"])
+        recurring.append({
+            'id': f"rec_bench_{i}",
+            "description": rng.choice(DESCRIPTIONS[category]),
+            "amount": f"{rng.uniform(5, 2500 if category == 'Salaire' else 150):.2f}",
+            "category": category,
+            "account": rng.choice(ACCOUNTS),
+            "frequency": frequencies[i % len(frequencies)],
+            "next_date": (today - datetime.timedelta(days=rng.randrange(14, 365))).strftime('%d-%m-%Y'),
+        })
+    return recurring
+
+def write_data_dir(data_dir, size, seed=0):
+    """Écrit un dossier fintrack_data complet (au format JSON de l'application)."""
+    os.makedirs(data_dir, exist_ok=True)
+    JsonStorage(get_app_data_path("transactions.json", data_dir)).save(generate_transactions(size, seed))
+    JsonStorage(get_app_data_path("accounts.json", data_dir)).save(ACCOUNTS)
+    JsonStorage(get_app_data_path("budgets.json", data_dir)).save(
+        [{'category': name, 'amount': median * 40} for name, _, median in CATEGORIES if name != "Salaire"])
+    JsonStorage(get_app_data_path("recurring.json", data_dir)).save(generate_recurring(seed=seed))
+
+# ==============================================================================
+# 2. MESURES
+# ==============================================================================
+
+def summarize(samples):
+    """Statistiques (en secondes) d'une série de mesures."""
+    return {'n': len(samples), 'median': statistics.median(samples), 'mean': statistics.fmean(samples),
+            'min': min(samples), 'max': max(samples)}
+
+def timed(function, *args):
+    started = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - started
+
+def bench_core(data_dir, repeat, seed=0):
+    """Chargement, sauvegarde et mutations unitaires des gestionnaires, puis rattrapage des récurrences."""
+    # Première ouverture hors mesure : migration éventuelle vers SQLite.
+    for manager_class in (AccountManager, BudgetManager, RecurringManager, TransactionManager):
+        manager_class(data_dir).close()
+    results = {}
+    results['TransactionManager()'] = summarize(
+        [timed(lambda: TransactionManager(data_dir).close()) for _ in range(repeat)])
+
+    manager = TransactionManager(data_dir)
+    started = time.perf_counter()
+    archived = manager.load_history()
+    results['TransactionManager.load_history'] = dict(summarize([time.perf_counter() - started]),
+                                                      rows=len(archived))
+    manager.close()
+
+    manager = TransactionManager(data_dir)
+    # Chemin JSON explicite : TransactionManager._load passerait par l'instantané binaire.
+    results['DataManager._load'] = summarize([timed(DataManager._load, manager) for _ in range(repeat)])
+    if manager.snapshot is not None:
+        results['LedgerSnapshot.load'] = summarize([timed(manager.snapshot.load) for _ in range(repeat)])
+    results['DataManager._save'] = summarize([timed(manager._save) for _ in range(repeat)])
+
+    rng = random.Random(seed + 1)
+    added = generate_transactions(OPERATION_SAMPLES, seed=seed + 1)
+    for t in added:
+        t['id'] = manager.new_id()
+    results['TransactionManager.add'] = summarize([timed(manager.add, t) for t in added])
+
+    targets = rng.sample([t['id'] for t in manager.data], OPERATION_SAMPLES)
+    updates = []
+    for transaction_id in targets:
+        changed = dict(manager.get(transaction_id), amount=f"{rng.uniform(1, 200):.2f}")
+        if rng.random() < 0.5:
+            # La moitié des modifications déplacent la transaction dans l'ordre chronologique.
+            changed['date'] = rng.choice(manager.data)['date']
+        updates.append((transaction_id, changed))
+    results['TransactionManager.update'] = summarize([timed(manager.update, *u) for u in updates])
+    results['TransactionManager.delete'] = summarize([timed(manager.delete, i) for i in targets])
+
+    recurring_manager = RecurringManager(data_dir)
+    started = time.perf_counter()
+    generated = RecurringScheduler(recurring_manager, manager).catch_up()
+    results['RecurringScheduler.catch_up'] = dict(summarize([time.perf_counter() - started]),
+                                                  generated=len(generated))
+    recurring_manager.close()
+    manager.close()
+    return results
+
+def bench_gui(data_dir, repeat):
+    """Rafraîchissement de l'historique, tableau de bord et récurrences dans l'application réelle."""
+    import main
+
+    def pump(until, timeout=120):
+        deadline = time.perf_counter() + timeout
+        while not until():
+            if time.perf_counter() > deadline:
+                raise TimeoutError("l'interface n'a pas répondu à temps")
+            app.update()
+
+    results = {}
+    started = time.perf_counter()
+    app = main.FinTrackApp(data_dir, interactive=False)
+    pump(lambda: 'ready' in app.startup_times)
+    results['startup_ready'] = summarize([time.perf_counter() - started])
+
+    def refresh():
+        app.refresh_treeview()
+        app.update_idletasks()
+    results['refresh_treeview'] = summarize([timed(refresh) for _ in range(repeat)])
+
+    shown = []
+    show_dashboard = app._show_dashboard
+    def record(result):
+        show_dashboard(result)
+        shown.append(time.perf_counter())
+    app._show_dashboard = record
+
+    started = time.perf_counter()
+    app.notebook.select(1)
+    pump(lambda: shown)
+    results['dashboard_first_open'] = summarize([shown[-1] - started])
+
+    def sample_dashboard():
+        count, started = len(shown), time.perf_counter()
+        app.update_dashboard()
+        pump(lambda: len(shown) > count)
+        return shown[-1] - started
+
+    # Cache de rendu vidé avant chaque mesure : calcul et rastérisation complets.
+    samples, hits = [], []
+    for _ in range(repeat):
+        app.dashboard_cache.clear()
+        samples.append(sample_dashboard())
+        hits.append(sample_dashboard())
+    results['update_dashboard'] = summarize(samples)
+    results['update_dashboard_cache_hit'] = summarize(hits)
+
+    # Les récurrences ont déjà été rattrapées au démarrage : coût d'un passage sans échéance.
+    results['process_recurring_transactions'] = summarize(
+        [timed(app.process_recurring_transactions) for _ in range(repeat)])
+    for name in ('account_manager', 'budget_manager', 'recurring_manager', 'transaction_manager'):
+        if name in app.__dict__:
+            app.__dict__[name].close()
+    app.destroy()
+    return results
+
+# ==============================================================================
+# 3. AFFICHAGE VIRTUEL & LANCEUR
+# ==============================================================================
+
+def start_virtual_display():
+    """Lance Xvfb si aucun affichage n'est disponible ; renvoie (processus, raison d'échec)."""
+    if os.environ.get('DISPLAY') or sys.platform in ('win32', 'darwin'):
+        return None, None
+    if shutil.which("Xvfb") is None:
+        return None, "pas d'affichage et Xvfb introuvable"
+    for number in range(99, 120):
+        if os.path.exists(f"/tmp/.X11-unix/X{number}"):
+            continue
+        process = subprocess.Popen(["Xvfb", f":{number}", "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for _ in range(50):
+            if os.path.exists(f"/tmp/.X11-unix/X{number}"):
+                os.environ['DISPLAY'] = f":{number}"
+                return process, None
+            if process.poll() is not None:
+                break
+            time.sleep(0.1)
+        process.kill()
+    return None, "Xvfb n'a pas pu démarrer"
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmarks(sizes, repeat, storage, gui, seed=0):
+    fintrack_core.STORAGE_BACKEND = storage
+    display, gui_skipped = (start_virtual_display() if gui else (None, "désactivé (--no-gui)"))
+    runs = {}
+    try:
+        for size in sizes:
+            with tempfile.TemporaryDirectory(prefix="fintrack_bench_") as workdir:
+                data_dir = os.path.join(workdir, "fintrack_data")
+                started = time.perf_counter()
+                write_data_dir(data_dir, size, seed)
+                print(f"[{size}] données générées en {time.perf_counter() - started:.1f} s", file=sys.stderr)
+                runs[size] = {'core': bench_core(data_dir, repeat, seed)}
+                print(f"[{size}] gestionnaires mesurés", file=sys.stderr)
+                # bench_core a déjà rattrapé les récurrences : aucune boîte de dialogue au démarrage.
+                if gui_skipped is None:
+                    runs[size]['gui'] = bench_gui(data_dir, repeat)
+                    print(f"[{size}] interface mesurée", file=sys.stderr)
+    finally:
+        if display is not None:
+            display.terminate()
+    return {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'storage': storage,
+        'repeat': repeat,
+        'gui_skipped': gui_skipped,
+        'results': runs,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FinTrack AI - banc d'essai sur historiques synthétiques")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), metavar="N",
+                        help="tailles d'historique à mesurer (défaut : 10000 100000 1000000)")
+    parser.add_argument("--repeat", type=int, default=3, help="répétitions des mesures globales (défaut : 3)")
+    parser.add_argument("--storage", choices=("json", "sqlite"), default=fintrack_core.STORAGE_BACKEND,
+                        help="stockage mesuré (défaut : FINTRACK_STORAGE ou json)")
+    parser.add_argument("--no-gui", dest="gui", action="store_false", help="ne mesure que les gestionnaires")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_results.jsonl",
+                        help="fichier JSON Lines auquel le résultat est ajouté (défaut : bench_results.jsonl)")
+    args = parser.parse_args()
+
+    record = run_benchmarks(args.sizes, args.repeat, args.storage, args.gui, args.seed)
+    with open(args.output, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    print(json.dumps(record, indent=4, ensure_ascii=False))
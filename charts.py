@@ -0,0 +1,48 @@
+"""Composants matplotlib de FinTrack AI.
+
+Ce module n'est importé qu'à la première ouverture d'un onglet graphique :
+matplotlib et son backend Tk ne pèsent donc pas sur le démarrage.
+"""
+import threading
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+from fintrack_core import traced
+
+
+class ThreadedCanvas(FigureCanvasTkAgg):
+    """Canevas Tk dont la rastérisation Agg peut être faite hors du thread Tk.
+
+    `render_lock` sérialise toute manipulation de la figure : le thread de
+    travail modifie les artistes et rastérise avec `render_offscreen`, puis
+    le thread Tk copie le tampon à l'écran avec `blit`. Le redimensionnement
+    (changement de taille de la figure et de l'image Tk) passe aussi par le verrou.
+    """
+    def __init__(self, figure, master=None):
+        self.render_lock = threading.RLock()
+        super().__init__(figure, master=master)
+
+    def resize(self, event):
+        with self.render_lock:
+            super().resize(event)
+
+    def _resize_figure_for_canvas_size(self, width, height):
+        # Appelé aussi hors de `resize` (changement de densité de pixels).
+        with self.render_lock:
+            super()._resize_figure_for_canvas_size(width, height)
+
+    @traced('ThreadedCanvas.draw')
+    def draw(self):
+        with self.render_lock:
+            super().draw()
+
+    @traced('ThreadedCanvas.render_offscreen')
+    def render_offscreen(self):
+        with self.render_lock:
+            FigureCanvasAgg.draw(self)
+
+    @traced('ThreadedCanvas.blit')
+    def blit(self, bbox=None):
+        with self.render_lock:
+            super().blit(bbox)
@@ -0,0 +1,1971 @@
+"""Cœur de FinTrack AI, utilisable sans interface graphique.
+
+Stockages, gestionnaires de données, agrégats et rapports : rien ici ne
+dépend de Tk, ce qui permet de produire des rapports sur un serveur (voir
+`python fintrack_core.py report --help` ou `python main.py report --help`).
+"""
+import os
+import json
+import bisect
+import sys
+import sqlite3
+import csv
+import heapq
+import itertools
+from collections import Counter
+import numpy as np
+import datetime
+import time
+import threading
+import argparse
+import atexit
+import hashlib
+import mmap
+import struct
+import re
+import math
+import unicodedata
+import cProfile
+import contextlib
+import warnings
+import functools
+from concurrent.futures import ProcessPoolExecutor
+
+# ==============================================================================
+# 1. INSTRUMENTATION DES CHEMINS CHAUDS
+# ==============================================================================
+
+class _Span:
+    __slots__ = ('trace', 'name', 'started')
+
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.trace.record(self.name, time.perf_counter() - self.started)
+
+_NO_SPAN = contextlib.nullcontext()
+
+class Instrumentation:
+    """Durées (spans) et compteurs des chemins chauds, consultables à chaud.
+
+    Désactivée, chaque point de mesure ne coûte qu'un test de `enabled`.
+    La variable d'environnement FINTRACK_TRACE l'active au démarrage ; elle
+    accepte une liste séparée par des virgules :
+      - `1` : mesures seules (fenêtre Diagnostics) ;
+      - `log[:fichier]` : une ligne JSON par span (défaut : fintrack_trace.jsonl) ;
+      - `profile[:fichier]` : profil cProfile du thread principal, écrit à la
+        sortie (défaut : fintrack.prof, à ouvrir avec pstats ou snakeviz).
+    """
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.spans = {}
+        self.counters = Counter()
+        self.log_file = None
+        self.profiler = None
+        self.profile_path = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_environment(cls, value=None):
+        value = os.environ.get('FINTRACK_TRACE', '') if value is None else value
+        trace = cls(enabled=bool(value) and value.lower() not in ('0', 'off', 'false'))
+        for option in filter(None, (part.strip() for part in value.split(','))):
+            kind, _, path = option.partition(':')
+            if kind == 'log':
+                trace.log_file = open(path or 'fintrack_trace.jsonl', 'a', encoding='utf-8')
+            elif kind == 'profile':
+                trace.profile_path = path or 'fintrack.prof'
+                trace.profiler = cProfile.Profile()
+                trace.profiler.enable()
+        if trace.log_file is not None or trace.profiler is not None:
+            atexit.register(trace.close)
+        return trace
+
+    def span(self, name):
+        """Contexte chronométrant le bloc sous `name` (sans effet si désactivée)."""
+        return _Span(self, name) if self.enabled else _NO_SPAN
+
+    def record(self, name, seconds):
+        with self._lock:
+            stats = self.spans.get(name)
+            if stats is None:
+                self.spans[name] = [1, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                if seconds > stats[2]:
+                    stats[2] = seconds
+            if self.log_file is not None:
+                self.log_file.write(json.dumps({'t': round(time.time(), 6), 'span': name,
+                                                'ms': round(seconds * 1000, 3),
+                                                'thread': threading.current_thread().name}) + "\n")
+
+    def count(self, name, amount=1):
+        if self.enabled:
+            with self._lock:
+                self.counters[name] += amount
+
+    def snapshot(self):
+        """{'spans': {nom: {calls, total_ms, mean_ms, max_ms}}, 'counters': {...}} à l'instant présent."""
+        with self._lock:
+            spans = {name: {'calls': calls, 'total_ms': total * 1000, 'mean_ms': total * 1000 / calls,
+                            'max_ms': longest * 1000}
+                     for name, (calls, total, longest) in self.spans.items()}
+            return {'enabled': self.enabled, 'spans': spans, 'counters': dict(self.counters)}
+
+    def reset(self):
+        with self._lock:
+            self.spans.clear()
+            self.counters.clear()
+
+    def close(self):
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler.dump_stats(self.profile_path)
+            self.profiler = None
+        with self._lock:
+            if self.log_file is not None:
+                self.log_file.close()
+                self.log_file = None
+
+TRACE = Instrumentation.from_environment()
+
+def traced(name):
+    """Décorateur : chronomètre chaque appel sous `name` quand l'instrumentation est active."""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not TRACE.enabled:
+                return function(*args, **kwargs)
+            with _Span(TRACE, name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+# ==============================================================================
+# 2. GESTIONNAIRE DE CHEMINS & CLASSES DE DONNÉES (SANS CHIFFREMENT)
+# ==============================================================================
+
+def get_app_data_path(filename, data_dir=None):
+    """Retourne un chemin sûr pour les fichiers de données (dans `data_dir` s'il est fourni)."""
+    if data_dir is not None:
+        return os.path.join(data_dir, filename)
+    if getattr(sys, 'frozen', False):
+        base_path = os.path.dirname(sys.executable)
+    else:
+        base_path = os.path.dirname(os.path.abspath(__file__))
+    data_dir = os.path.join(base_path, 'fintrack_data')
+    os.makedirs(data_dir, exist_ok=True)
+    return os.path.join(data_dir, filename)
+
+class JsonStorage:
+    """Stockage historique : tout le fichier JSON est réécrit à chaque sauvegarde."""
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        """Retourne les données du fichier, ou None s'il est absent ou illisible."""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return None
+
+    def save(self, data):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4)
+            TRACE.count('bytes_written', f.tell())
+
+    def apply(self, op, key, record, data):
+        """Persiste une mutation unitaire ; ici, en réécrivant tout le fichier."""
+        self.save(data)
+
+    def apply_many(self, ops, data):
+        """Persiste un lot de mutations `(op, clé, enregistrement)` en une seule écriture."""
+        self.save(data)
+
+    def close(self):
+        pass
+
+class JournalStorage(JsonStorage):
+    """Journal en ajout seul au-dessus d'un instantané JSON.
+
+    Chaque mutation (add/update/delete) est ajoutée comme une ligne JSON dans
+    `<fichier>.journal`. Au chargement, l'instantané est relu puis le journal
+    rejoué. Quand le journal dépasse `compact_threshold` lignes, il est mis de
+    côté (`.journal.pending`) et un nouvel instantané est écrit en tâche de
+    fond. Le rejeu est idempotent (upsert/suppression par clé), ce qui rend
+    sûr un arrêt brutal à n'importe quelle étape de la compaction.
+    En lecture seule (`read_only`), le chargement ne répare ni ne compacte rien.
+    """
+    def __init__(self, path, key_field='id', compact_threshold=1000, read_only=False):
+        super().__init__(path)
+        self.key_field = key_field
+        self.compact_threshold = compact_threshold
+        self.read_only = read_only
+        self.journal_path = f"{path}.journal"
+        self.pending_path = f"{path}.journal.pending"
+        self._lock = threading.Lock()
+        self._journal_file = None
+        self._journal_count = 0
+        self._compaction = None
+
+    def load(self):
+        data = super().load()
+        data = list(data) if data is not None else None
+        replayed = self._replay(self.pending_path, data)
+        if replayed is not None:
+            data = replayed
+        self._journal_count = 0
+        replayed = self._replay(self.journal_path, data, count=True)
+        if replayed is not None:
+            data = replayed
+        if os.path.exists(self.pending_path) and not self.read_only:
+            # Compaction interrompue : on la termine avant de reprendre.
+            self._write_snapshot(data or [])
+            os.remove(self.pending_path)
+            self._reset_journal()
+        return data
+
+    def _replay(self, path, data, count=False):
+        """Rejoue un journal sur `data`.
+
+        Seule la dernière ligne peut être déchirée par un arrêt brutal : illisible,
+        elle est tronquée. Une ligne illisible suivie d'autres est sautée avec un
+        avertissement, sans perdre les mutations qui la suivent.
+        """
+        if not os.path.exists(path):
+            return None
+        records = data if data is not None else []
+        index = {r.get(self.key_field): i for i, r in enumerate(records)}
+        offset, unreadable = 0, None
+        with open(path, 'rb') as f:
+            for number, line in enumerate(f, start=1):
+                if unreadable is not None:
+                    warnings.warn(f"{path} : ligne {unreadable[1]} illisible, ignorée", RuntimeWarning)
+                    if count:
+                        self._journal_count += 1
+                    unreadable = None
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("ligne incomplète")
+                    entry = json.loads(line)
+                    op, key, record = entry['op'], entry['key'], entry.get('record')
+                except (ValueError, KeyError, TypeError):
+                    unreadable = (offset, number)
+                    offset += len(line)
+                    continue
+                offset += len(line)
+                if count:
+                    self._journal_count += 1
+                if op == 'delete':
+                    i = index.pop(key, None)
+                    if i is not None:
+                        records[i] = None
+                    continue
+                i = index.pop(key, None)
+                if i is None:
+                    i = index.get(record.get(self.key_field))
+                if i is None:
+                    records.append(record)
+                    i = len(records) - 1
+                else:
+                    records[i] = record
+                index[record.get(self.key_field)] = i
+        if unreadable is not None and not self.read_only:
+            # Écriture déchirée en fin de journal.
+            with open(path, 'r+b') as f:
+                f.truncate(unreadable[0])
+        return [r for r in records if r is not None]
+
+    def save(self, data):
+        """Réécriture complète : nouvel instantané et journal vidé."""
+        self.wait_for_compaction()
+        with self._lock:
+            self._write_snapshot(data)
+            if os.path.exists(self.pending_path):
+                os.remove(self.pending_path)
+            self._reset_journal()
+
+    def apply(self, op, key, record, data):
+        self.apply_many([(op, key, record)], data)
+
+    def apply_many(self, ops, data):
+        if len(ops) >= self.compact_threshold:
+            # Gros lot (import) : un instantané complet coûte moins qu'autant de lignes.
+            self.save(data)
+            return
+        lines = "".join(json.dumps({'op': op, 'key': key, 'record': record}, ensure_ascii=False) + "\n"
+                        for op, key, record in ops)
+        with self._lock:
+            if self._journal_file is None:
+                self._journal_file = open(self.journal_path, 'a', encoding='utf-8')
+            self._journal_file.write(lines)
+            if TRACE.enabled:
+                TRACE.count('bytes_written', len(lines.encode('utf-8')))
+            self._journal_file.flush()
+            os.fsync(self._journal_file.fileno())
+            self._journal_count += len(ops)
+            if (self._journal_count >= self.compact_threshold and self._compaction is None
+                    and not os.path.exists(self.pending_path)):
+                self._start_compaction(data)
+
+    def _start_compaction(self, data):
+        # Appelé sous verrou : les mutations suivantes iront dans un journal neuf.
+        self._close_journal()
+        os.replace(self.journal_path, self.pending_path)
+        self._journal_count = 0
+        snapshot = list(data)
+        self._compaction = threading.Thread(target=self._compact, args=(snapshot,), daemon=True)
+        self._compaction.start()
+
+    def _compact(self, snapshot):
+        try:
+            self._write_snapshot(snapshot)
+            os.remove(self.pending_path)
+        finally:
+            with self._lock:
+                self._compaction = None
+
+    def journal_lines(self):
+        """Nombre de mutations en attente dans le journal courant."""
+        return self._journal_count
+
+    def resume(self, journal_lines):
+        """Reprend l'état d'un chargement fait hors de `load` (instantané binaire à jour)."""
+        self._journal_count = journal_lines
+
+    def wait_for_compaction(self):
+        compaction = self._compaction
+        if compaction is not None:
+            compaction.join()
+
+    def close(self):
+        self.wait_for_compaction()
+        with self._lock:
+            self._close_journal()
+
+    def _write_snapshot(self, data):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            # Sérialisation compacte en un seul appel : seul ce chemin utilise
+            # l'encodeur C (json.dump ou indent retombent sur l'encodeur Python).
+            f.write(json.dumps(data if isinstance(data, list) else list(data)))
+            TRACE.count('bytes_written', f.tell())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def _reset_journal(self):
+        self._close_journal()
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self._journal_count = 0
+
+    def _close_journal(self):
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+
+class PartitionedStorage:
+    """Transactions réparties par année : fichier courant et archives annuelles.
+
+    `transactions.json` (journalisé) ne contient que l'année en cours, la
+    précédente et les dates illisibles ; chaque année plus ancienne a son
+    fichier journalisé `archives/transactions-AAAA.json`. Seul le fichier
+    courant est chargé au démarrage, une archive l'est à la demande
+    (`load_archive`) ou, en interne, quand une mutation la touche : chaque
+    mutation n'écrit que dans la partition de sa transaction. Au premier
+    chargement d'une nouvelle année, les transactions devenues anciennes
+    migrent vers leur archive (archive écrite d'abord : l'opération peut
+    être rejouée sans risque). Avec `lazy=False`, `load` renvoie tout.
+    """
+    RECENT_YEARS = 2
+
+    def __init__(self, path, lazy=True, read_only=False, today=None):
+        self.recent = JournalStorage(path, read_only=read_only)
+        self.lazy = lazy
+        self.read_only = read_only
+        self.cutoff = (today or datetime.date.today()).year - (self.RECENT_YEARS - 1)
+        stem = os.path.splitext(os.path.basename(path))[0]
+        self.archive_dir = os.path.join(os.path.dirname(path), 'archives')
+        self.archive_pattern = os.path.join(self.archive_dir, f"{stem}-{{}}.json")
+        self.archive_prefix = f"{stem}-"
+        self.archives = {}
+        self.location = {}
+        self.exposed = set()
+
+    @property
+    def path(self):
+        return self.recent.path
+
+    def partition_of(self, record):
+        """Année d'archive d'une transaction, ou None si elle relève du fichier courant."""
+        try:
+            return self.partition_of_ordinal(parse_date_ordinal(record['date']))
+        except (ValueError, KeyError, TypeError, OverflowError):
+            return None
+
+    def partition_of_ordinal(self, ordinal):
+        """Comme `partition_of`, pour une date déjà analysée (0 : date illisible)."""
+        if not ordinal or ordinal >= datetime.date(self.cutoff, 1, 1).toordinal():
+            return None
+        return datetime.date.fromordinal(ordinal).year
+
+    def load(self):
+        data = self.recent.load()
+        if data is not None and not self.read_only:
+            data = self._roll_over(data)
+        if self.lazy:
+            return data
+        archived = [t for year in self.archived_years() for t in self.load_archive(year)]
+        return (data or []) + archived if data is not None or archived else None
+
+    def load_years(self, first, last):
+        """Fichier courant et archives des années `first` à `last` (incluses)."""
+        data = list(self.recent.load() or [])
+        for year in self.archived_years():
+            if first <= year <= last:
+                data.extend(self.load_archive(year))
+        return data
+
+    def archived_years(self):
+        """Années archivées non encore remises au gestionnaire, de la plus récente à la plus ancienne."""
+        years = set(self.archives)
+        if os.path.isdir(self.archive_dir):
+            for name in os.listdir(self.archive_dir):
+                year = name[len(self.archive_prefix):].split('.', 1)[0]
+                if name.startswith(self.archive_prefix) and year.isdigit():
+                    years.add(int(year))
+        return sorted(years - self.exposed, reverse=True)
+
+    def load_archive(self, year):
+        """Transactions d'une année archivée ; elle est ensuite considérée comme chargée."""
+        self.exposed.add(year)
+        return list(self._archive(year)[1].values())
+
+    def iter_recent(self, data):
+        """Transactions de `data` qui relèvent du fichier courant."""
+        return (t for t in data if t.get('id') not in self.location)
+
+    def adopt(self, columns):
+        """Accepte un chargement fait hors de `load` si aucune transaction n'a vieilli entre-temps."""
+        # Toute date lisible compte, montant valide ou non (0 : date illisible, gardée au fichier courant).
+        dates = columns.dates[:columns.size]
+        dates = dates[dates > 0]
+        return not (dates < datetime.date(self.cutoff, 1, 1).toordinal()).any()
+
+    def save(self, data):
+        """Réécrit le fichier courant et les archives concernées par `data`.
+
+        Les archives jamais chargées ne sont pas touchées ; celles remises au
+        gestionnaire sont remplacées par leur contenu dans `data`.
+        """
+        recent, grouped = [], {}
+        for t in data:
+            year = self.partition_of(t)
+            (recent if year is None else grouped.setdefault(year, [])).append(t)
+        self.recent.save(recent)
+        for year in set(grouped) | (self.exposed & set(self.archives)):
+            storage, records = self._archive(year)
+            if year in self.exposed:
+                for key in records:
+                    self.location.pop(key, None)
+                records.clear()
+            for t in grouped.get(year, []):
+                records[t.get('id')] = t
+                self.location[t.get('id')] = year
+            storage.save(list(records.values()))
+
+    def apply(self, op, key, record, data):
+        self.apply_many([(op, key, record)], data)
+
+    def apply_many(self, ops, data, ordinals=None):
+        """Route chaque mutation vers sa partition ; `ordinals` (dates déjà analysées,
+        parallèles à `ops`) évite de relire les dates d'un gros lot."""
+        recent_ops, archive_ops = [], {}
+
+        def route(year, op, key, record):
+            (recent_ops if year is None else archive_ops.setdefault(year, [])).append((op, key, record))
+
+        for index, (op, key, record) in enumerate(ops):
+            source = self.location.get(key)
+            if op == 'delete':
+                route(source, 'delete', key, None)
+                self._forget(source, key)
+                continue
+            if ordinals is not None:
+                target = self.partition_of_ordinal(ordinals[index])
+            else:
+                target = self.partition_of(record)
+            if op == 'update' and source != target:
+                # Changement d'année : suppression d'un côté, ajout de l'autre.
+                route(source, 'delete', key, None)
+                self._forget(source, key)
+                op = 'add'
+            route(target, op, record.get('id'), record)
+            self._remember(target, record)
+
+        for year, year_ops in archive_ops.items():
+            storage, records = self.archives[year]
+            storage.apply_many(year_ops, records.values())
+        if recent_ops:
+            self.recent.apply_many(recent_ops, self.iter_recent(data))
+
+    def close(self):
+        self.recent.close()
+        for storage, records in self.archives.values():
+            storage.close()
+
+    def _archive(self, year):
+        """(stockage, {id: transaction}) d'une archive, chargée au premier accès."""
+        archive = self.archives.get(year)
+        if archive is None:
+            if not self.read_only:
+                os.makedirs(self.archive_dir, exist_ok=True)
+            storage = JournalStorage(self.archive_pattern.format(year), read_only=self.read_only)
+            records = {t.get('id'): t for t in storage.load() or []}
+            self.location.update(dict.fromkeys(records, year))
+            archive = self.archives[year] = (storage, records)
+        return archive
+
+    def _forget(self, year, key):
+        if year is not None:
+            self.location.pop(key, None)
+            self._archive(year)[1].pop(key, None)
+
+    def _remember(self, year, record):
+        if year is not None:
+            self._archive(year)[1][record.get('id')] = record
+            self.location[record.get('id')] = year
+
+    def _roll_over(self, data):
+        moved = {}
+        for t in data:
+            year = self.partition_of(t)
+            if year is not None:
+                moved.setdefault(year, []).append(t)
+        if not moved:
+            return data
+        for year, transactions in moved.items():
+            storage, records = self._archive(year)
+            for t in transactions:
+                records[t.get('id')] = t
+                self.location[t.get('id')] = year
+            storage.apply_many([('add', t.get('id'), t) for t in transactions], records.values())
+        kept = [t for t in data if self.partition_of(t) is None]
+        self.recent.save(kept)
+        return kept
+
+class SqliteStorage:
+    """Stockage SQLite : une table indexée par gestionnaire, une ligne par enregistrement.
+
+    Les mutations unitaires sont des requêtes d'une ligne dans leur propre
+    transaction. Au premier chargement d'une table, le contenu de l'ancien
+    stockage JSON (`legacy`) est migré une fois pour toutes.
+    """
+    TABLES = {
+        'transactions': ('id', ("id TEXT PRIMARY KEY", "date TEXT", "iso_date TEXT", "description TEXT",
+                                "amount TEXT", "category TEXT", "account TEXT"),
+                         ("iso_date", "account", "category")),
+        'budgets': ('category', ("category TEXT PRIMARY KEY", "amount REAL"), ()),
+        'accounts': ('name', ("name TEXT PRIMARY KEY",), ()),
+        'recurring': ('id', ("id TEXT PRIMARY KEY", "payload TEXT"), ()),
+    }
+
+    def __init__(self, path, table, legacy=None, read_only=False):
+        self.path = path
+        self.table = table
+        self.legacy = legacy
+        self.read_only = read_only
+        self.key_column, columns, indexes = self.TABLES[table]
+        self.columns = [c.split()[0] for c in columns]
+        if read_only:
+            # Base absente : rien n'a encore été migré, la lecture passe par `legacy`.
+            self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True) if os.path.exists(path) \
+                else sqlite3.connect(":memory:")
+            return
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS migrations (name TEXT PRIMARY KEY, migrated_at TEXT)")
+            self.conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(columns)})")
+            for column in indexes:
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table}({column})")
+
+    def load(self):
+        if self.read_only:
+            if not self.is_migrated():
+                return self.legacy.load() if self.legacy is not None else None
+        else:
+            self._migrate()
+        rows = self.conn.execute(f"SELECT {', '.join(self.columns)} FROM {self.table} ORDER BY rowid").fetchall()
+        return [self._from_row(row) for row in rows] or None
+
+    def is_migrated(self):
+        try:
+            return self.conn.execute("SELECT 1 FROM migrations WHERE name = ?", (self.table,)).fetchone() is not None
+        except sqlite3.OperationalError:
+            return False
+
+    def _migrate(self):
+        if self.is_migrated():
+            return
+        legacy_data = self.legacy.load() if self.legacy is not None else None
+        with self.conn:
+            if legacy_data:
+                self._insert_all(legacy_data)
+            self.conn.execute("INSERT INTO migrations VALUES (?, ?)", (self.table, datetime.datetime.now().isoformat()))
+
+    def save(self, data):
+        with self.conn:
+            self.conn.execute(f"DELETE FROM {self.table}")
+            self._insert_all(data)
+
+    def apply(self, op, key, record, data):
+        self.apply_many([(op, key, record)], data)
+
+    def apply_many(self, ops, data):
+        with self.conn:
+            for op, key, record in ops:
+                if op == 'delete' or (op == 'update' and self._key(record) != key):
+                    self.conn.execute(f"DELETE FROM {self.table} WHERE {self.key_column} = ?", (key,))
+                if op != 'delete':
+                    self.conn.execute(self._upsert_sql(), self._to_row(record))
+
+    def query(self, account=None, category=None, start=None, end=None):
+        """Transactions filtrées via les index (dates `datetime.date`, bornes incluses)."""
+        clauses, params = [], []
+        for column, value in (("account", account), ("category", category)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if start is not None:
+            clauses.append("iso_date >= ?")
+            params.append(start.isoformat())
+        if end is not None:
+            clauses.append("iso_date <= ?")
+            params.append(end.isoformat())
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.conn.execute(
+            f"SELECT {', '.join(self.columns)} FROM {self.table}{where} ORDER BY iso_date DESC, rowid", params)
+        return [self._from_row(row) for row in rows]
+
+    def close(self):
+        self.conn.close()
+
+    def _insert_all(self, data):
+        self.conn.executemany(self._upsert_sql(), (self._to_row(r) for r in data))
+
+    def _upsert_sql(self):
+        updates = ', '.join(f"{c} = excluded.{c}" for c in self.columns if c != self.key_column) or "rowid = rowid"
+        return (f"INSERT INTO {self.table} ({', '.join(self.columns)}) VALUES ({', '.join('?' * len(self.columns))}) "
+                f"ON CONFLICT({self.key_column}) DO UPDATE SET {updates}")
+
+    def _key(self, record):
+        return record if self.table == 'accounts' else record.get(self.key_column)
+
+    def _to_row(self, record):
+        if self.table == 'transactions':
+            try:
+                iso_date = datetime.datetime.strptime(record['date'], '%d-%m-%Y').date().isoformat()
+            except (ValueError, KeyError):
+                iso_date = record.get('date')
+            return (record.get('id'), record.get('date'), iso_date, record.get('description'),
+                    str(record.get('amount')), record.get('category'), record.get('account'))
+        if self.table == 'budgets':
+            return (record['category'], record['amount'])
+        if self.table == 'accounts':
+            return (record,)
+        return (record.get('id'), json.dumps(record, ensure_ascii=False))
+
+    def _from_row(self, row):
+        if self.table == 'transactions':
+            record = dict(zip(self.columns, row))
+            del record['iso_date']
+            return record
+        if self.table == 'budgets':
+            return {'category': row[0], 'amount': row[1]}
+        if self.table == 'accounts':
+            return row[0]
+        return json.loads(row[1])
+
+# Moteur de stockage : "json" (défaut, journal pour les transactions) ou "sqlite".
+STORAGE_BACKEND = os.environ.get('FINTRACK_STORAGE', 'json').lower()
+
+def create_storage(name, data_dir=None, read_only=False):
+    """Construit le stockage d'un gestionnaire selon `STORAGE_BACKEND`."""
+    json_path = get_app_data_path(f"{name}.json", data_dir)
+    if name == 'transactions':
+        # Lecture seule (rapports) et migration vers SQLite ont besoin de tout l'historique ;
+        # la migration ne doit pas réécrire le JSON qu'elle lit (pas de bascule en archives).
+        migrating = STORAGE_BACKEND == 'sqlite'
+        legacy = PartitionedStorage(json_path, lazy=not (read_only or migrating), read_only=read_only or migrating)
+    else:
+        legacy = JsonStorage(json_path)
+    if STORAGE_BACKEND == 'sqlite':
+        return SqliteStorage(get_app_data_path("fintrack.db", data_dir), name, legacy=legacy, read_only=read_only)
+    return legacy
+
+class DataManager:
+    """Gère les données d'un gestionnaire via un stockage interchangeable (JSON par défaut)."""
+    def __init__(self, filename, storage=None, data_dir=None):
+        self.filename = get_app_data_path(f"{filename}.json", data_dir)
+        self.storage = storage or create_storage(filename, data_dir)
+        self.data = self._load()
+
+    @traced('DataManager._load')
+    def _load(self):
+        data = self.storage.load()
+        if data is not None:
+            TRACE.count('rows_loaded', len(data))
+        return self._get_default_data() if data is None else data
+
+    @traced('DataManager._save')
+    def _save(self):
+        TRACE.count('rows_written', len(self.data))
+        self.storage.save(self.data)
+
+    @traced('DataManager._commit')
+    def _commit(self, op, key, record=None):
+        """Persiste une mutation unitaire via le stockage (journal ou réécriture)."""
+        TRACE.count('rows_written')
+        self.storage.apply(op, key, record, self.data)
+
+    @traced('DataManager._commit_many')
+    def _commit_many(self, ops):
+        """Persiste un lot de mutations en une seule écriture."""
+        TRACE.count('rows_written', len(ops))
+        self.storage.apply_many(ops, self.data)
+
+    def close(self):
+        self.storage.close()
+
+    def _get_default_data(self):
+        return []
+
+DEFAULT_ACCOUNTS = ("Compte Courant", "Épargne")
+
+class AccountManager(DataManager):
+    def __init__(self, data_dir=None):
+        super().__init__("accounts", data_dir=data_dir)
+
+    def _get_default_data(self):
+        return list(DEFAULT_ACCOUNTS)
+
+def parse_date_ordinal(value):
+    """Ordinal d'une date 'jj-mm-aaaa' (strptime seulement hors format canonique)."""
+    if len(value) == 10 and value[2] == '-' and value[5] == '-':
+        return datetime.date(int(value[6:]), int(value[3:5]), int(value[:2])).toordinal()
+    return datetime.datetime.strptime(value, '%d-%m-%Y').toordinal()
+
+INT64_MAX = 2 ** 63 - 1
+
+def parse_cents(value):
+    """Montant en centimes entiers ('12,5' -> 1250) ; ValueError si non fini ou hors int64."""
+    cents = float(str(value).replace(',', '.')) * 100
+    if not math.isfinite(cents) or abs(cents) >= INT64_MAX:
+        raise ValueError(f"montant hors limites : {value!r}")
+    return int(round(cents))
+
+class ColumnarLedger:
+    """Vue colonnaire des transactions : tableaux NumPy parallèles.
+
+    Dates (ordinaux), montants (centimes int64) et codes de catégorie/compte
+    internés sont analysés une seule fois, au chargement ou à l'insertion. Les
+    lignes supprimées sont marquées invalides puis recyclées. Les transactions
+    dont la date ou le montant sont illisibles restent hors des agrégations
+    (`valid` faux) ; la date, elle, est gardée dès qu'elle est lisible (0 sinon),
+    si bien que l'ordre chronologique ne dépend pas du montant.
+
+    Ces colonnes accélèrent les calculs mais ne remplacent pas les
+    dictionnaires de `TransactionManager.data`, qui restent la référence et
+    dominent la mémoire : pour 500 000 transactions, environ 310 Mo de
+    dictionnaires contre 40 Mo de plus pour les colonnes et leur index `rows`.
+    """
+    def __init__(self, capacity=1024):
+        self.dates = np.zeros(capacity, dtype=np.int32)
+        self.cents = np.zeros(capacity, dtype=np.int64)
+        self.categories = np.zeros(capacity, dtype=np.int32)
+        self.accounts = np.zeros(capacity, dtype=np.int32)
+        self.valid = np.zeros(capacity, dtype=bool)
+        self.size = 0
+        self.rows = {}
+        self.free_rows = []
+        self.category_names, self.category_codes = [], {}
+        self.account_names, self.account_codes = [], {}
+
+    @classmethod
+    def from_transactions(cls, transactions):
+        ledger = cls(max(1024, len(transactions)))
+        ledger.extend(transactions)
+        return ledger
+
+    @classmethod
+    def from_arrays(cls, ids, dates, cents, categories, accounts, valid, category_names, account_names):
+        """Reconstruit le stockage à partir de colonnes déjà analysées (instantané binaire)."""
+        size = len(ids)
+        ledger = cls(max(1024, size))
+        for name, column in (('dates', dates), ('cents', cents), ('categories', categories),
+                             ('accounts', accounts), ('valid', valid)):
+            getattr(ledger, name)[:size] = column
+        ledger.size = size
+        ledger.rows = dict(zip(ids, range(size)))
+        ledger.category_names = list(category_names)
+        ledger.category_codes = {name: code for code, name in enumerate(category_names)}
+        ledger.account_names = list(account_names)
+        ledger.account_codes = {name: code for code, name in enumerate(account_names)}
+        return ledger
+
+    @staticmethod
+    def parse(transaction):
+        """(ordinal, centimes, valide) : seule analyse des dates et montants, partagée avec l'historique.
+
+        Une date lisible est conservée même si le montant ne l'est pas.
+        """
+        try:
+            ordinal = parse_date_ordinal(transaction['date'])
+        except (ValueError, KeyError, TypeError, OverflowError):
+            return 0, 0, False
+        try:
+            return ordinal, parse_cents(transaction['amount']), True
+        except (ValueError, KeyError, TypeError, OverflowError):
+            return ordinal, 0, False
+
+    def extend(self, transactions, parsed=None):
+        """Ajoute un lot en fin de tableaux ; renvoie la plage de lignes `(début, fin)`.
+
+        `parsed`, s'il est fourni, donne les ordinaux et centimes déjà validés du lot.
+        """
+        start = self.size
+        self._reserve(start + len(transactions))
+        stop = start + len(transactions)
+        if parsed is not None:
+            self.dates[start:stop], self.cents[start:stop] = parsed
+            self.valid[start:stop] = True
+        elif transactions:
+            dates, cents, valid = zip(*map(self.parse, transactions))
+            self.dates[start:stop] = dates
+            self.cents[start:stop] = cents
+            self.valid[start:stop] = valid
+        self.categories[start:stop] = [self._intern(t.get('category'), self.category_names, self.category_codes)
+                                       for t in transactions]
+        self.accounts[start:stop] = [self._intern(t.get('account'), self.account_names, self.account_codes)
+                                     for t in transactions]
+        self.rows.update((t.get('id'), row) for row, t in enumerate(transactions, start))
+        self.size = stop
+        return start, stop
+
+    def append(self, transaction):
+        row = self.free_rows.pop() if self.free_rows else self._next_row()
+        self.rows[transaction.get('id')] = row
+        self._fill(row, transaction)
+
+    def remove(self, transaction_id):
+        row = self.rows.pop(transaction_id, None)
+        if row is not None:
+            self.valid[row] = False
+            self.free_rows.append(row)
+
+    def replace(self, transaction_id, transaction):
+        self.remove(transaction_id)
+        self.append(transaction)
+
+    def entry(self, transaction_id):
+        """(ordinal, centimes, catégorie, compte) d'une transaction valide, sinon None."""
+        row = self.rows.get(transaction_id)
+        if row is None or not self.valid[row]:
+            return None
+        return (int(self.dates[row]), int(self.cents[row]),
+                self.category_names[self.categories[row]], self.account_names[self.accounts[row]])
+
+    def date_of(self, transaction_id):
+        """Ordinal de la date d'une transaction (0 si illisible ou inconnue)."""
+        row = self.rows.get(transaction_id)
+        return int(self.dates[row]) if row is not None else 0
+
+    def _mask(self, account=None, start=None, end=None):
+        mask = self.valid[:self.size].copy()
+        if account is not None:
+            mask &= self.accounts[:self.size] == self.account_codes.get(account, -1)
+        if start is not None:
+            mask &= self.dates[:self.size] >= start.toordinal()
+        if end is not None:
+            mask &= self.dates[:self.size] <= end.toordinal()
+        return mask
+
+    def _next_row(self):
+        self._reserve(self.size + 1)
+        self.size += 1
+        return self.size - 1
+
+    def _reserve(self, size):
+        if size > len(self.valid):
+            capacity = max(size, 2 * len(self.valid))
+            for name in ('dates', 'cents', 'categories', 'accounts', 'valid'):
+                column = getattr(self, name)
+                grown = np.zeros(capacity, dtype=column.dtype)
+                grown[:self.size] = column[:self.size]
+                setattr(self, name, grown)
+
+    def _fill(self, row, transaction):
+        self.dates[row], self.cents[row], self.valid[row] = self.parse(transaction)
+        self.categories[row] = self._intern(transaction.get('category'), self.category_names, self.category_codes)
+        self.accounts[row] = self._intern(transaction.get('account'), self.account_names, self.account_codes)
+
+    @staticmethod
+    def _intern(name, names, codes):
+        code = codes.get(name)
+        if code is None:
+            code = codes[name] = len(names)
+            names.append(name)
+        return code
+
+class LedgerSnapshot:
+    """Instantané binaire des transactions, écrit à côté du JSON (`transactions.json.snap`).
+
+    Le JSON (et son journal) restent la référence et le format d'export :
+    l'instantané n'est qu'un cache, utilisé seulement si la taille, la date
+    de modification et l'empreinte BLAKE2 de chaque fichier source sont
+    celles relevées à son écriture. Il contient un en-tête JSON puis des
+    colonnes de largeur fixe (ordinaux, centimes, codes de catégorie et de
+    compte, validité) et les textes (id, date, description, montant) en
+    tables de chaînes séparées par NUL. Au chargement, les colonnes sont
+    copiées telles quelles et chaque table de textes est décodée d'un bloc ;
+    les transactions sont ensuite toutes reconstruites en dictionnaires. Le
+    gain porte donc sur le décodage JSON et l'analyse des dates et montants,
+    pas sur la création des enregistrements ni sur la mémoire.
+    Seules les transactions aux champs standard, tous textuels, sont prises
+    en charge ; sinon aucun instantané n'est écrit.
+    """
+    MAGIC = b"FTSNAP01"
+    VERSION = 2
+    FIELDS = ('id', 'date', 'description', 'amount', 'category', 'account')
+    TEXT_FIELDS = ('id', 'date', 'description', 'amount')
+    COLUMNS = (('dates', np.int32), ('cents', np.int64), ('categories', np.int32),
+               ('accounts', np.int32), ('valid', np.bool_))
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.path = f"{storage.path}.snap"
+
+    @staticmethod
+    def _digest(path):
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def _sources(self):
+        """État (taille, mtime, empreinte) du JSON et du journal ; None pendant une compaction."""
+        if os.path.exists(self.storage.pending_path):
+            return None
+        sources = {}
+        for role, path in (('json', self.storage.path), ('journal', self.storage.journal_path)):
+            if os.path.exists(path):
+                stat = os.stat(path)
+                sources[role] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        return sources
+
+    def _is_current(self, recorded):
+        """Compare d'abord taille et mtime (gratuits), puis l'empreinte complète."""
+        current = self._sources()
+        if current is None or set(current) != set(recorded):
+            return False
+        for role, stat in current.items():
+            if (stat['size'], stat['mtime_ns']) != (recorded[role]['size'], recorded[role]['mtime_ns']):
+                return False
+        paths = {'json': self.storage.path, 'journal': self.storage.journal_path}
+        return all(self._digest(paths[role]) == recorded[role]['hash'] for role in current)
+
+    @traced('LedgerSnapshot.load')
+    def load(self):
+        """(transactions, ColumnarLedger) si l'instantané est à jour, sinon None."""
+        try:
+            with open(self.path, 'rb') as f:
+                if f.read(len(self.MAGIC)) != self.MAGIC:
+                    return None
+                header_size, = struct.unpack('<Q', f.read(8))
+                header = json.loads(f.read(header_size))
+                if header.get('version') != self.VERSION or not self._is_current(header['sources']):
+                    return None
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    count = header['count']
+                    columns = {}
+                    for name, dtype in self.COLUMNS:
+                        offset = header['offsets'][name]
+                        columns[name] = np.frombuffer(mapped, dtype=dtype, count=count, offset=offset).copy()
+                    texts = {}
+                    for field in self.TEXT_FIELDS:
+                        offset, length = header['offsets'][field], header['lengths'][field]
+                        texts[field] = mapped[offset:offset + length].decode('utf-8').split('\x00') if count else []
+        except (OSError, ValueError, KeyError, struct.error):
+            return None
+        if any(len(values) != count for values in texts.values()):
+            return None
+
+        categories, accounts = header['category_names'], header['account_names']
+        transactions = [
+            {'id': i, 'date': d, 'description': desc, 'amount': a, 'category': categories[c], 'account': accounts[acc]}
+            for i, d, desc, a, c, acc in zip(texts['id'], texts['date'], texts['description'], texts['amount'],
+                                             columns['categories'].tolist(), columns['accounts'].tolist())]
+        ledger = ColumnarLedger.from_arrays(texts['id'], columns['dates'], columns['cents'], columns['categories'],
+                                            columns['accounts'], columns['valid'], categories, accounts)
+        self.storage.resume(header['journal_lines'])
+        TRACE.count('rows_loaded', count)
+        return transactions, ledger
+
+    @traced('LedgerSnapshot.write')
+    def write(self, transactions, columns):
+        """Écrit l'instantané de `transactions` (dans l'ordre) ; à appeler stockage fermé.
+
+        Renvoie False, et supprime un éventuel ancien instantané, si les
+        données ne s'y prêtent pas (champs non standard, texte contenant NUL).
+        """
+        if not self._supports(transactions, columns):
+            self.discard()
+            return False
+        sources = self._sources()
+        if sources is None:
+            return False
+        paths = {'json': self.storage.path, 'journal': self.storage.journal_path}
+        for role, stat in sources.items():
+            stat['hash'] = self._digest(paths[role])
+
+        rows = np.fromiter((columns.rows[t['id']] for t in transactions), dtype=np.int64, count=len(transactions))
+        blobs = [(name, getattr(columns, name)[rows].astype(dtype).tobytes()) for name, dtype in self.COLUMNS]
+        blobs += [(field, "\x00".join(t[field] for t in transactions).encode('utf-8')) for field in self.TEXT_FIELDS]
+        header = {'version': self.VERSION, 'count': len(transactions), 'sources': sources,
+                  'journal_lines': self.storage.journal_lines(),
+                  'category_names': columns.category_names, 'account_names': columns.account_names,
+                  'offsets': {}, 'lengths': {}}
+        # Les offsets dépendent de la taille de l'en-tête, qui dépend des offsets :
+        # on réserve une place généreuse pour l'en-tête, puis on aligne chaque colonne sur 8 octets.
+        reserved = len(json.dumps(header).encode('utf-8')) + 80 * len(blobs) + 64
+        position = len(self.MAGIC) + 8 + reserved
+        for name, blob in blobs:
+            position += -position % 8
+            header['offsets'][name], header['lengths'][name] = position, len(blob)
+            position += len(blob)
+        encoded = json.dumps(header).encode('utf-8').ljust(reserved)
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(self.MAGIC + struct.pack('<Q', reserved) + encoded)
+            for name, blob in blobs:
+                f.write(b"\x00" * (header['offsets'][name] - f.tell()))
+                f.write(blob)
+            TRACE.count('bytes_written', f.tell())
+        os.replace(tmp_path, self.path)
+        return True
+
+    def discard(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _supports(self, transactions, columns):
+        ids = {t.get('id') for t in transactions}
+        if len(ids) != len(transactions) or not ids <= columns.rows.keys():
+            return False
+        for t in transactions:
+            if tuple(t) != self.FIELDS:
+                return False
+            for field in self.TEXT_FIELDS:
+                value = t[field]
+                if type(value) is not str or "\x00" in value:
+                    return False
+            if type(t['category']) is not str or type(t['account']) is not str:
+                return False
+        return True
+
+def month_index(date):
+    """Indice de mois absolu (année * 12 + mois - 1), clé des agrégats mensuels."""
+    return date.year * 12 + date.month - 1
+
+class MonthlyRollups:
+    """Totaux par (compte, mois, catégorie), tenus à jour à chaque mutation.
+
+    `buckets[(compte, mois)]` associe à chaque catégorie [centimes, nombre] ;
+    le compte None regroupe tous les comptes. Interroger un mois coûte donc
+    O(nombre de catégories), quel que soit le volume de l'historique.
+    Les montants sont cumulés en valeur absolue, comme sur le tableau de bord.
+    `version` change à chaque modification, y compris d'une instance à l'autre :
+    elle sert de clé aux caches de rendu.
+    """
+    _versions = itertools.count()
+
+    def __init__(self):
+        self.buckets = {}
+        self.version = next(self._versions)
+
+    @classmethod
+    def from_columns(cls, columns):
+        """Construit les agrégats en une passe vectorisée sur le stockage colonnaire."""
+        rollups = cls()
+        rollups.add_rows(columns, 0, columns.size)
+        return rollups
+
+    def add_rows(self, columns, start, stop):
+        """Ajoute en une passe vectorisée les lignes `start:stop` du stockage colonnaire."""
+        valid = columns.valid[start:stop]
+        if not valid.any():
+            return
+        days = columns.dates[start:stop][valid] - datetime.date(1970, 1, 1).toordinal()
+        months = days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64) + 1970 * 12
+        # Clé (compte, mois, catégorie) empaquetée dans un int64 : np.unique reste unidimensionnel.
+        keys = (columns.accounts[start:stop][valid].astype(np.int64) << 40) | (months << 20) \
+            | columns.categories[start:stop][valid]
+        unique_keys, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        sums = np.bincount(inverse, weights=np.abs(columns.cents[start:stop][valid]))
+        for key, total, count in zip(unique_keys.tolist(), sums.tolist(), counts.tolist()):
+            self._add(columns.account_names[key >> 40], (key >> 20) & 0xFFFFF,
+                      columns.category_names[key & 0xFFFFF], int(round(total)), count)
+
+    def add(self, entry):
+        if entry is not None:
+            ordinal, cents, category, account = entry
+            self._add(account, month_index(datetime.date.fromordinal(ordinal)), category, abs(cents), 1)
+
+    def remove(self, entry):
+        if entry is not None:
+            ordinal, cents, category, account = entry
+            self._add(account, month_index(datetime.date.fromordinal(ordinal)), category, -abs(cents), -1)
+
+    def month(self, year, month, account=None):
+        """{catégorie: centimes} pour un mois donné (tous comptes si `account` est None)."""
+        bucket = self.buckets.get((account, year * 12 + month - 1), {})
+        return {category: cents for category, (cents, count) in bucket.items()}
+
+    def totals(self, year, month, account=None, income_category='Salaire'):
+        """(revenus, dépenses) en centimes pour un mois donné."""
+        by_category = self.month(year, month, account)
+        income = by_category.get(income_category, 0)
+        return income, sum(by_category.values()) - income
+
+    def months(self, account=None):
+        """Mois (année, mois) ayant au moins une transaction, du plus récent au plus ancien."""
+        indexes = sorted((m for (a, m), bucket in self.buckets.items() if a == account and bucket), reverse=True)
+        return [(m // 12, m % 12 + 1) for m in indexes]
+
+    def _add(self, account, month, category, cents, count):
+        self.version = next(self._versions)
+        for key in ((account, month), (None, month)):
+            bucket = self.buckets.setdefault(key, {})
+            totals = bucket.setdefault(category, [0, 0])
+            totals[0] += cents
+            totals[1] += count
+            if totals[1] <= 0:
+                del bucket[category]
+
+class LedgerTrends:
+    """Séries multi-annuelles (soldes, revenus/dépenses, moyennes glissantes).
+
+    Les colonnes utiles du stockage colonnaire sont copiées à la construction
+    (à faire sous `TransactionManager.lock`), puis chaque série est obtenue
+    par une passe `np.bincount` sur des indices de jour ou de mois, sans
+    boucle sur les transactions. Comme sur le tableau de bord, la catégorie
+    de revenus compte en positif et toutes les autres en négatif.
+    """
+    def __init__(self, columns, account=None, income_category='Salaire'):
+        mask = columns._mask(account)
+        self.dates = columns.dates[:columns.size][mask].astype(np.int64)
+        self.amounts = np.abs(columns.cents[:columns.size][mask]) / 100
+        self.categories = columns.categories[:columns.size][mask]
+        self.accounts = columns.accounts[:columns.size][mask]
+        self.category_names = list(columns.category_names)
+        self.account_names = list(columns.account_names)
+        self.is_income = self.categories == columns.category_codes.get(income_category, -1)
+        epoch = datetime.date(1970, 1, 1).toordinal()
+        months = (self.dates - epoch).astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+        self.first_month = int(months.min()) if len(months) else 0
+        self.month_numbers = months - self.first_month
+        self.month_count = int(self.month_numbers.max()) + 1 if len(months) else 0
+        self.epoch = epoch
+
+    def months(self):
+        """Mois couverts, en `datetime64[M]`."""
+        return (np.arange(self.month_count) + self.first_month).astype('datetime64[M]')
+
+    def running_balances(self):
+        """(jours en `datetime64[D]`, {compte: solde cumulé jour par jour})."""
+        if not len(self.dates):
+            return np.array([], dtype='datetime64[D]'), {}
+        first, day_count = int(self.dates.min()), int(self.dates.max() - self.dates.min()) + 1
+        signed = np.where(self.is_income, self.amounts, -self.amounts)
+        flat = np.bincount(self.accounts * day_count + (self.dates - first), weights=signed,
+                           minlength=len(self.account_names) * day_count).reshape(-1, day_count)
+        days = (np.arange(day_count) + first - self.epoch).astype('datetime64[D]')
+        present = np.unique(self.accounts)
+        return days, {self.account_names[a]: np.cumsum(flat[a]) for a in present.tolist()}
+
+    def monthly_income_expense(self):
+        """(mois, revenus, dépenses) mois par mois, mois vides compris."""
+        income = np.bincount(self.month_numbers, weights=np.where(self.is_income, self.amounts, 0),
+                             minlength=self.month_count)
+        expense = np.bincount(self.month_numbers, weights=np.where(self.is_income, 0, self.amounts),
+                              minlength=self.month_count)
+        return self.months(), income, expense
+
+    def rolling_category_averages(self, window=3, top=6):
+        """(mois, {catégorie: moyenne glissante sur `window` mois}) des `top` catégories de dépenses."""
+        expenses = ~self.is_income
+        codes, months = self.categories[expenses], self.month_numbers[expenses]
+        if not len(codes) or not self.month_count:
+            return self.months(), {}
+        totals = np.bincount(codes * self.month_count + months, weights=self.amounts[expenses],
+                             minlength=len(self.category_names) * self.month_count).reshape(-1, self.month_count)
+        ranked = np.argsort(-totals.sum(axis=1), kind='stable')[:top]
+        cumulative = np.cumsum(np.pad(totals[ranked], ((0, 0), (1, 0))), axis=1)
+        # Moyenne sur la fenêtre finissant à chaque mois ; les premiers mois moyennent ce qui existe.
+        upper = np.arange(1, self.month_count + 1)
+        lower = np.maximum(upper - window, 0)
+        averages = (cumulative[:, upper] - cumulative[:, lower]) / (upper - lower)
+        return self.months(), {self.category_names[code]: averages[i]
+                               for i, code in enumerate(ranked.tolist()) if totals[code].any()}
+
+def downsample_series(x, y, width):
+    """Réduit une série à au plus ~2 points par pixel en gardant minimum et maximum de chaque colonne.
+
+    Le tracé reste visuellement identique (pics compris) tandis que matplotlib
+    ne reçoit que quelques milliers de points, quelle que soit la durée.
+    """
+    n = len(y)
+    width = max(int(width), 1)
+    if n <= 2 * width:
+        return x, y
+    buckets = np.arange(n) * width // n
+    order = np.lexsort((y, buckets))
+    starts = np.flatnonzero(np.r_[True, buckets[order][1:] != buckets[order][:-1]])
+    ends = np.r_[starts[1:], n] - 1
+    keep = np.unique(np.concatenate([order[starts], order[ends], [0, n - 1]]))
+    return x[keep], y[keep]
+
+class SearchIndex:
+    """Index de recherche de l'historique, tenu à jour à chaque mutation.
+
+    Les descriptions sont découpées en mots normalisés (minuscules, sans
+    accents) ; `postings` associe chaque mot aux lignes du stockage
+    colonnaire qui le contiennent et `vocabulary`, triée, sert d'index de
+    préfixes (une plage `bisect` par mot saisi). Chaque mot de la requête
+    doit préfixer un mot de la description. Les critères de date, montant,
+    catégorie et compte sont des comparaisons vectorisées sur les colonnes,
+    restreintes aux lignes retenues par le texte s'il y en a.
+    """
+    TOKEN = re.compile(r"\w+")
+
+    def __init__(self, columns, transactions):
+        self.columns = columns
+        self.postings = {}
+        self.vocabulary = []
+        self.records = [None] * columns.size
+        self._tokens = {}
+        by_description = {}
+        for t in transactions:
+            row = columns.rows[t.get('id')]
+            self.records[row] = t
+            by_description.setdefault(t.get('description') or '', []).append(row)
+        for description, rows in by_description.items():
+            for token in self.tokenize(description):
+                self.postings.setdefault(token, set()).update(rows)
+        self.vocabulary = sorted(self.postings)
+
+    def tokenize(self, text):
+        """Mots distincts de `text`, en minuscules et sans accents (mis en cache par texte)."""
+        tokens = self._tokens.get(text)
+        if tokens is None:
+            plain = unicodedata.normalize('NFKD', text.casefold())
+            plain = "".join(c for c in plain if not unicodedata.combining(c))
+            tokens = self._tokens[text] = frozenset(self.TOKEN.findall(plain))
+        return tokens
+
+    def add(self, row, transaction):
+        if row >= len(self.records):
+            self.records.extend([None] * (row + 1 - len(self.records)))
+        self.records[row] = transaction
+        for token in self.tokenize(transaction.get('description') or ''):
+            rows = self.postings.get(token)
+            if rows is None:
+                rows = self.postings[token] = set()
+                bisect.insort(self.vocabulary, token)
+            rows.add(row)
+
+    def remove(self, row, transaction):
+        self.records[row] = None
+        for token in self.tokenize(transaction.get('description') or ''):
+            rows = self.postings.get(token)
+            if rows is not None:
+                rows.discard(row)
+                if not rows:
+                    del self.postings[token]
+                    del self.vocabulary[bisect.bisect_left(self.vocabulary, token)]
+
+    def match_text(self, text):
+        """Lignes dont la description contient, pour chaque mot saisi, un mot qui commence ainsi."""
+        result = None
+        for prefix in self.tokenize(text):
+            lo = bisect.bisect_left(self.vocabulary, prefix)
+            hi = bisect.bisect_left(self.vocabulary, prefix + "\U0010ffff")
+            matched = set().union(*(self.postings[token] for token in self.vocabulary[lo:hi]))
+            result = matched if result is None else result & matched
+            if not result:
+                break
+        return result
+
+    def search(self, text=None, start=None, end=None, min_cents=None, max_cents=None, category=None, account=None):
+        """Transactions correspondant à tous les critères fournis, de la plus récente à la plus ancienne."""
+        columns, size = self.columns, self.columns.size
+        if text and text.strip():
+            matched = self.match_text(text)
+            if not matched:
+                return []
+            rows = np.fromiter(matched, dtype=np.int64, count=len(matched))
+        else:
+            rows = np.arange(size)
+        mask = np.ones(len(rows), dtype=bool)
+        # Dates et montants illisibles (lignes invalides) ne satisfont aucun critère de plage.
+        if start is not None or end is not None or min_cents is not None or max_cents is not None:
+            mask &= columns.valid[rows]
+        if start is not None:
+            mask &= columns.dates[rows] >= start.toordinal()
+        if end is not None:
+            mask &= columns.dates[rows] <= end.toordinal()
+        if min_cents is not None:
+            mask &= columns.cents[rows] >= min_cents
+        if max_cents is not None:
+            mask &= columns.cents[rows] <= max_cents
+        if category is not None:
+            mask &= columns.categories[rows] == columns.category_codes.get(category, -1)
+        if account is not None:
+            mask &= columns.accounts[rows] == columns.account_codes.get(account, -1)
+        rows = rows[mask]
+        rows = rows[np.argsort(-columns.dates[rows].astype(np.int64), kind='stable')]
+        records = self.records
+        return [t for t in (records[r] for r in rows.tolist() if r < len(records)) if t is not None]
+
+class TransactionManager(DataManager):
+    """Transactions triées par date décroissante, maintenues par insertion dichotomique.
+
+    `_sort_keys` est parallèle à `data` et contient l'opposé de l'ordinal de
+    chaque date (ordre croissant, donc compatible avec `bisect`) ; `by_id`
+    donne l'accès direct à une transaction. Une transaction est localisée
+    par dichotomie sur sa date, puis dans la seule série de même date.
+    `lock` protège les colonnes et les agrégats, lus par les threads de calcul des graphiques.
+    """
+    def __init__(self, data_dir=None):
+        # Pas de DataManager.__init__ : `_load` renvoie aussi les colonnes et l'état de l'instantané.
+        self.filename = get_app_data_path("transactions.json", data_dir)
+        self.storage = create_storage("transactions", data_dir)
+        # Cache binaire facultatif, seulement au-dessus du fichier JSON courant.
+        self.snapshot = LedgerSnapshot(self.storage.recent) if isinstance(self.storage, PartitionedStorage) else None
+        self.data, self.columns, self._snapshot_stale = self._load()
+        self.lock = threading.RLock()
+        if self.columns is None:
+            self.columns = ColumnarLedger.from_transactions(self.data)
+            self._sort_transactions()
+        else:
+            # L'instantané est écrit dans l'ordre de `data` : ligne i = transaction i, déjà triée.
+            self._sort_keys = (-self.columns.dates[:self.columns.size].astype(np.int64)).tolist()
+        self.rollups = MonthlyRollups.from_columns(self.columns)
+        self.by_id = {t.get('id'): t for t in self.data}
+        self._id_sequence = itertools.count(len(self.data))
+        self._search = None
+
+    @traced('TransactionManager._load')
+    def _load(self):
+        """(transactions, colonnes ou None, instantané à réécrire), sans modifier le gestionnaire."""
+        cached = self.snapshot.load() if self.snapshot is not None else None
+        if cached is None or not self.storage.adopt(cached[1]):
+            # Instantané périmé, ou changement d'année : le chargement complet fait la migration.
+            return super()._load(), None, True
+        data, columns = cached
+        return data, columns, False
+
+    def _save(self):
+        self._snapshot_stale = True
+        super()._save()
+
+    def _commit(self, op, key, record=None):
+        self._snapshot_stale = True
+        super()._commit(op, key, record)
+
+    def _commit_many(self, ops, ordinals=None):
+        self._snapshot_stale = True
+        if ordinals is not None and isinstance(self.storage, PartitionedStorage):
+            TRACE.count('rows_written', len(ops))
+            self.storage.apply_many(ops, self.data, ordinals)
+        else:
+            super()._commit_many(ops)
+
+    def close(self):
+        """Ferme le stockage puis, si les données ont changé, réécrit l'instantané binaire."""
+        super().close()
+        if self.snapshot is not None and self._snapshot_stale:
+            try:
+                self.snapshot.write(list(self.storage.iter_recent(self.data)), self.columns)
+            except OSError:
+                # Simple cache : le prochain lancement relira le JSON.
+                self.snapshot.discard()
+
+    def add(self, transaction):
+        with self.lock:
+            self.columns.append(transaction)
+            self.rollups.add(self.columns.entry(transaction.get('id')))
+        if self._search is not None:
+            self._search.add(self.columns.rows[transaction.get('id')], transaction)
+        self._insert_sorted(transaction)
+        self._commit('add', transaction['id'], transaction)
+
+    def delete(self, transaction_id):
+        transaction = self.by_id.get(transaction_id)
+        if self._remove_sorted(transaction_id) is None:
+            return
+        if self._search is not None:
+            self._search.remove(self.columns.rows[transaction_id], transaction)
+        with self.lock:
+            self.rollups.remove(self.columns.entry(transaction_id))
+            self.columns.remove(transaction_id)
+        self._commit('delete', transaction_id)
+
+    def update(self, transaction_id, new_data):
+        old_key = -self.columns.date_of(transaction_id)
+        old_transaction = self.by_id.get(transaction_id)
+        i = self._remove_sorted(transaction_id)
+        if i is None:
+            return
+        if self._search is not None:
+            self._search.remove(self.columns.rows[transaction_id], old_transaction)
+        with self.lock:
+            self.rollups.remove(self.columns.entry(transaction_id))
+            self.columns.replace(transaction_id, new_data)
+            self.rollups.add(self.columns.entry(new_data.get('id')))
+        if self._search is not None:
+            self._search.add(self.columns.rows[new_data.get('id')], new_data)
+        if -self.columns.date_of(new_data.get('id')) == old_key:
+            # Même date : la transaction garde sa place parmi celles du même jour.
+            self._sort_keys.insert(i, old_key)
+            self.data.insert(i, new_data)
+            self.by_id[new_data.get('id')] = new_data
+        else:
+            self._insert_sorted(new_data)
+        self._commit('update', transaction_id, new_data)
+
+    def add_many(self, transactions, parsed=None):
+        """Ajoute un lot de transactions : une seule fusion triée et une seule écriture.
+
+        `parsed` = (ordinaux, centimes) du lot, déjà validés (import CSV) : rien n'est réanalysé.
+        """
+        if not transactions:
+            return
+        self._merge(transactions, parsed)
+        self._commit_many([('add', t['id'], t) for t in transactions],
+                          ordinals=parsed[0] if parsed is not None else None)
+
+    def archived_years(self):
+        """Années archivées pas encore chargées, de la plus récente à la plus ancienne."""
+        return self.storage.archived_years() if isinstance(self.storage, PartitionedStorage) else []
+
+    def load_archive(self, year):
+        """Charge une année archivée dans l'historique ; renvoie les transactions ajoutées."""
+        loaded = [t for t in self.storage.load_archive(year) if t.get('id') not in self.by_id]
+        if loaded:
+            self._merge(loaded)
+        return loaded
+
+    def load_history(self, start=None):
+        """Charge les archives jusqu'à l'année de `start` incluse (toutes si None)."""
+        loaded = []
+        for year in self.archived_years():
+            if start is None or year >= start.year:
+                loaded.extend(self.load_archive(year))
+        return loaded
+
+    def _merge(self, transactions, parsed=None):
+        """Intègre un lot à l'ordre, aux colonnes et aux agrégats, sans l'enregistrer."""
+        with self.lock:
+            start, stop = self.columns.extend(transactions, parsed)
+            self.rollups.add_rows(self.columns, start, stop)
+        if self._search is not None:
+            for row, t in enumerate(transactions, start):
+                self._search.add(row, t)
+        negated = (-self.columns.dates[start:stop].astype(np.int64)).tolist()
+        batch = sorted(zip(negated, transactions), key=lambda p: p[0])
+        # À date égale, heapq.merge garde l'existant avant le lot, comme _insert_sorted.
+        merged = list(heapq.merge(zip(self._sort_keys, self.data), batch, key=lambda p: p[0]))
+        self._sort_keys = [key for key, t in merged]
+        self.data[:] = [t for key, t in merged]
+        self.by_id.update((t.get('id'), t) for t in transactions)
+
+    def get(self, transaction_id):
+        return self.by_id.get(transaction_id)
+
+    def search(self, **criteria):
+        """Recherche indexée (voir `SearchIndex.search`) ; l'index est construit au premier appel."""
+        if self._search is None:
+            with TRACE.span('SearchIndex.build'):
+                self._search = SearchIndex(self.columns, self.data)
+        with TRACE.span('TransactionManager.search'):
+            return self._search.search(**criteria)
+
+    def new_id(self):
+        """Identifiant inédit, même pour plusieurs créations dans la même milliseconde."""
+        while True:
+            candidate = f"trans_{int(time.time() * 1000)}_{next(self._id_sequence)}"
+            if candidate not in self.by_id:
+                return candidate
+
+    def between(self, start, end):
+        """Transactions datées de `start` à `end` inclus (`datetime.date`), plus récentes d'abord."""
+        lo = bisect.bisect_left(self._sort_keys, -end.toordinal())
+        hi = bisect.bisect_right(self._sort_keys, -start.toordinal())
+        return self.data[lo:hi]
+
+    def query(self, account=None, category=None, start=None, end=None):
+        """Transactions filtrées par compte, catégorie et période (bornes incluses)."""
+        if hasattr(self.storage, 'query'):
+            return self.storage.query(account, category, start, end)
+        transactions = self.data
+        if start is not None or end is not None:
+            transactions = self.between(start or datetime.date.min, end or datetime.date.max)
+        return [t for t in transactions
+                if (account is None or t.get('account') == account)
+                and (category is None or t.get('category') == category)]
+
+    def _insert_sorted(self, transaction):
+        key = -self.columns.date_of(transaction.get('id'))
+        i = bisect.bisect_right(self._sort_keys, key)
+        self._sort_keys.insert(i, key)
+        self.data.insert(i, transaction)
+        self.by_id[transaction.get('id')] = transaction
+
+    def _remove_sorted(self, transaction_id):
+        transaction = self.by_id.pop(transaction_id, None)
+        if transaction is None:
+            return None
+        key = -self.columns.date_of(transaction_id)
+        i = bisect.bisect_left(self._sort_keys, key)
+        while self.data[i] is not transaction:
+            i += 1
+        del self._sort_keys[i]
+        del self.data[i]
+        return i
+
+    @traced('TransactionManager._sort_transactions')
+    def _sort_transactions(self):
+        # Juste après le chargement, la ligne i du stockage colonnaire est data[i] :
+        # tri stable sur les ordinaux, sans clé Python par transaction.
+        negated = -self.columns.dates[:len(self.data)].astype(np.int64)
+        order = np.argsort(negated, kind='stable')
+        self.data[:] = [self.data[i] for i in order.tolist()]
+        self._sort_keys = negated[order].tolist()
+
+class BudgetManager(DataManager):
+    def __init__(self, data_dir=None):
+        super().__init__("budgets", data_dir=data_dir)
+
+    def get_budget(self, category):
+        for budget in self.data:
+            if budget['category'] == category: return float(budget['amount'])
+        return 0.0
+
+    def set_budget(self, category, amount):
+        for budget in self.data:
+            if budget['category'] == category:
+                budget['amount'] = amount
+                self._commit('update', category, budget)
+                return
+        budget = {'category': category, 'amount': amount}
+        self.data.append(budget)
+        self._commit('add', category, budget)
+
+class RecurringManager(DataManager):
+    def __init__(self, data_dir=None):
+        super().__init__("recurring", data_dir=data_dir)
+
+    def add(self, recurring_data):
+        self.data.append(recurring_data)
+        self._commit('add', recurring_data['id'], recurring_data)
+
+    def delete(self, recurring_id):
+        self.data = [r for r in self.data if r.get('id') != recurring_id]
+        self._commit('delete', recurring_id)
+
+class RecurringScheduler:
+    """Génère les occurrences dues des transactions récurrentes, rattrapage compris.
+
+    Chaque récurrence en retard est placée dans une file de priorité sur sa
+    date d'échéance ; on dépile l'échéance la plus proche, on crée la
+    transaction et on rempile l'occurrence suivante tant qu'elle est due.
+    Les occurrences sont calculées depuis la première échéance en retard
+    (fin de mois bornée sans dérive). Toutes les transactions produites sont
+    enregistrées en un seul lot, les récurrences mises à jour en un autre.
+    """
+    FREQUENCIES = {'Hebdomadaire': {'weeks': 1}, 'Mensuel': {'months': 1},
+                   'Trimestriel': {'months': 3}, 'Annuel': {'years': 1}}
+
+    def __init__(self, recurring_manager, transaction_manager):
+        self.recurring_manager = recurring_manager
+        self.transaction_manager = transaction_manager
+
+    @traced('RecurringScheduler.catch_up')
+    def catch_up(self, today=None):
+        """Crée toutes les occurrences échues jusqu'à `today` inclus ; renvoie les transactions créées."""
+        from dateutil.relativedelta import relativedelta
+        today = today or datetime.date.today()
+        due = []
+        for index, recurring in enumerate(self.recurring_manager.data):
+            step = self.FREQUENCIES.get(recurring.get('frequency'))
+            if step is None:
+                continue
+            anchor = datetime.datetime.strptime(recurring['next_date'], '%d-%m-%Y').date()
+            if anchor <= today:
+                due.append((anchor, index, 0, anchor))
+        heapq.heapify(due)
+
+        generated, updated = [], {}
+        while due:
+            occurrence, index, k, anchor = heapq.heappop(due)
+            recurring = self.recurring_manager.data[index]
+            generated.append({
+                'id': self.transaction_manager.new_id(),
+                "date": occurrence.strftime('%d-%m-%Y'),
+                "description": recurring['description'], "amount": recurring['amount'],
+                "category": recurring['category'], "account": recurring['account']
+            })
+            step = self.FREQUENCIES[recurring['frequency']]
+            following = anchor + relativedelta(**{unit: n * (k + 1) for unit, n in step.items()})
+            if following <= today:
+                heapq.heappush(due, (following, index, k + 1, anchor))
+            else:
+                recurring['next_date'] = following.strftime('%d-%m-%Y')
+                updated[index] = recurring
+
+        self.transaction_manager.add_many(generated)
+        if updated:
+            self.recurring_manager._commit_many([('update', r.get('id'), r) for r in updated.values()])
+        return generated
+
+class CsvImporter:
+    """Import en flux d'un export bancaire CSV vers le `TransactionManager`.
+
+    Le fichier est lu ligne à ligne ; les lignes sont validées et normalisées
+    par lots de `BATCH_SIZE` (date 'jj-mm-aaaa', montant décimal à point),
+    puis dédoublonnées contre l'historique par leur contenu (y compris les
+    années archivées que couvre le relevé). Les doublons sont
+    comptés en multiensemble : deux lignes identiques légitimes dans un export
+    ne sont écartées que si l'historique en contient déjà deux. Le tout est
+    enregistré en un seul lot via `TransactionManager.add_many`.
+    """
+    BATCH_SIZE = 10000
+    MAX_REPORTED_ERRORS = 100
+    DATE_FORMATS = ('%d-%m-%Y', '%d/%m/%Y', '%Y-%m-%d', '%d.%m.%Y')
+    HEADER_ALIASES = {'libellé': 'description', 'libelle': 'description', 'montant': 'amount',
+                      'catégorie': 'category', 'categorie': 'category', 'compte': 'account'}
+
+    def __init__(self, manager, default_account, default_category="Autres"):
+        self.manager = manager
+        self.default_account = default_account
+        self.default_category = default_category
+        self.imported = 0
+        self.duplicates = 0
+        self.error_count = 0
+        self.errors = []
+
+    @traced('CsvImporter.run')
+    def run(self, path):
+        normalized = []
+        rows = self.read_rows(path)
+        while True:
+            batch = list(itertools.islice(rows, self.BATCH_SIZE))
+            if not batch:
+                break
+            normalized.extend(self.normalize_batch(batch))
+        if normalized:
+            # Les doublons se cherchent aussi dans les années archivées couvertes par le relevé.
+            self.manager.load_history(datetime.date.fromordinal(min(key[0] for key, t in normalized)))
+        known = self._ledger_keys()
+        new_transactions, ordinals, cents = [], [], []
+        for key, t in normalized:
+            if known[key] > 0:
+                known[key] -= 1
+                self.duplicates += 1
+                continue
+            t['id'] = self.manager.new_id()
+            new_transactions.append(t)
+            ordinals.append(key[0])
+            cents.append(key[1])
+        # Dates et montants déjà analysés à la normalisation : ni les colonnes ni le routage par année ne les relisent.
+        self.manager.add_many(new_transactions, parsed=(ordinals, cents))
+        self.imported = len(new_transactions)
+        return self
+
+    def read_rows(self, path):
+        """Générateur de (numéro de ligne, dict) ; le fichier n'est jamais chargé en entier."""
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            sample = f.read(4096)
+            f.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+            except csv.Error:
+                dialect = csv.excel
+            reader = csv.reader(f, dialect)
+            header = [self.HEADER_ALIASES.get(h.strip().lower(), h.strip().lower()) for h in next(reader, [])]
+            for line, values in enumerate(reader, start=2):
+                if values:
+                    yield line, dict(zip(header, values))
+
+    def normalize_batch(self, batch):
+        """Génère (clé de contenu, transaction normalisée) ; les lignes invalides sont comptées."""
+        for line, row in batch:
+            try:
+                date = self._normalize_date(row.get('date') or '')
+                cents = self._normalize_cents(row.get('amount') or '')
+            except (ValueError, OverflowError) as error:
+                self.error_count += 1
+                if len(self.errors) < self.MAX_REPORTED_ERRORS:
+                    self.errors.append((line, str(error)))
+                continue
+            description = (row.get('description') or '').strip()
+            category = (row.get('category') or '').strip() or self.default_category
+            account = (row.get('account') or '').strip() or self.default_account
+            t = {'id': None, 'date': f"{date.day:02d}-{date.month:02d}-{date.year:04d}",
+                 'description': description, 'amount': f"{cents / 100:.2f}",
+                 'category': category, 'account': account}
+            yield (date.toordinal(), cents, description, category, account), t
+
+    def _ledger_keys(self):
+        """Multiensemble des clés de contenu de l'historique, dates et montants lus en colonnes."""
+        columns, data = self.manager.columns, self.manager.data
+        rows = np.fromiter((columns.rows.get(t.get('id'), -1) for t in data), dtype=np.int64, count=len(data))
+        valid = ((rows >= 0) & columns.valid[np.maximum(rows, 0)]).tolist()
+        known = Counter()
+        for t, ok, date, cents in zip(data, valid, columns.dates[rows].tolist(), columns.cents[rows].tolist()):
+            if not ok:
+                date, cents = t.get('date'), t.get('amount')
+            known[(date, cents, t.get('description'), t.get('category'), t.get('account'))] += 1
+        return known
+
+    def _normalize_date(self, value):
+        value = value.strip()
+        try:
+            # Formats usuels à largeur fixe, sans passer par strptime.
+            if len(value) == 10 and value[2] == value[5] and value[2] in '-/.':
+                return datetime.date(int(value[6:]), int(value[3:5]), int(value[:2]))
+            if len(value) == 10 and value[4] == value[7] == '-':
+                return datetime.date(int(value[:4]), int(value[5:7]), int(value[8:]))
+        except ValueError:
+            raise ValueError(f"date invalide : {value!r}") from None
+        for date_format in self.DATE_FORMATS:
+            try:
+                return datetime.datetime.strptime(value, date_format).date()
+            except ValueError:
+                continue
+        raise ValueError(f"date invalide : {value!r}")
+
+    @staticmethod
+    def _normalize_cents(value):
+        try:
+            return parse_cents(value)
+        except ValueError:
+            pass
+        cleaned = value.replace('€', '').replace('\u00a0', '').replace(' ', '').strip()
+        if ',' in cleaned and '.' in cleaned:
+            # Le dernier séparateur est le séparateur décimal, l'autre sépare les milliers.
+            thousands = '.' if cleaned.rfind(',') > cleaned.rfind('.') else ','
+            cleaned = cleaned.replace(thousands, '')
+        cleaned = cleaned.replace(',', '.')
+        try:
+            return parse_cents(cleaned)
+        except ValueError:
+            raise ValueError(f"montant invalide : {value!r}") from None
+
+def validate_transaction(transaction):
+    """Vérifie une transaction saisie ; lève ValueError avec un message affichable."""
+    if not all([transaction['description'], transaction['amount'], transaction['category'], transaction['account']]):
+        raise ValueError("Tous les champs sauf l'ID sont requis.")
+    try:
+        # Même règle que le stockage colonnaire : ni inf, ni nan, ni dépassement int64.
+        parse_cents(transaction['amount'])
+    except ValueError:
+        raise ValueError("Le montant doit être un nombre fini valide.") from None
+    try:
+        parse_date_ordinal(transaction['date'])
+    except ValueError:
+        raise ValueError("La date doit être au format jj-mm-aaaa.") from None
+
+# ==============================================================================
+# 3. RAPPORTS & LIGNE DE COMMANDE (SANS INTERFACE)
+# ==============================================================================
+
+REPORT_KINDS = ('monthly', 'yearly', 'budget', 'categories')
+
+def months_between(start, end):
+    """Mois (année, mois) de `start` à `end` inclus."""
+    return [(index // 12, index % 12 + 1) for index in range(month_index(start), month_index(end) + 1)]
+
+def summarize_transactions(transactions, start, end):
+    """{(année, mois): {catégorie: centimes}} sur la période, via les agrégats vectorisés."""
+    rollups = MonthlyRollups.from_columns(ColumnarLedger.from_transactions(transactions))
+    return {(year, month): rollups.month(year, month)
+            for year, month in months_between(start, end) if rollups.month(year, month)}
+
+def read_only_data(name, data_dir, default):
+    """Contenu d'un stockage ouvert en lecture seule (sans migration ni écriture)."""
+    storage = create_storage(name, data_dir, read_only=True)
+    try:
+        data = storage.load()
+    finally:
+        storage.close()
+    return default if data is None else data
+
+def report_shard(data_dir, start, end, account=None, excluded_accounts=()):
+    """Tâche d'un processus de travail : agrégats d'un répertoire, d'un compte et d'une période.
+
+    Le stockage est ouvert en lecture seule ; avec SQLite, seules les lignes
+    du compte et de la période sont lues grâce aux index, et en JSON seules
+    les archives des années de la période.
+    """
+    storage = create_storage('transactions', data_dir, read_only=True)
+    try:
+        if isinstance(storage, SqliteStorage) and storage.is_migrated():
+            transactions = storage.query(account=account, start=start, end=end)
+        elif isinstance(storage, PartitionedStorage):
+            transactions = storage.load_years(start.year, end.year)
+        else:
+            transactions = storage.load() or []
+    finally:
+        storage.close()
+    if account is not None or excluded_accounts:
+        transactions = [t for t in transactions
+                        if (account is None or t.get('account') == account)
+                        and t.get('account') not in excluded_accounts]
+    return data_dir, summarize_transactions(transactions, start, end)
+
+def plan_report_shards(data_dirs, start, end, shard='none'):
+    """Découpe le travail par répertoire, puis par compte ou par année selon `shard`."""
+    shards = []
+    for data_dir in data_dirs:
+        if shard == 'account':
+            accounts = tuple(read_only_data('accounts', data_dir, DEFAULT_ACCOUNTS))
+            shards.extend((data_dir, start, end, account, ()) for account in accounts)
+            # Transactions rattachées à un compte absent de la liste des comptes.
+            shards.append((data_dir, start, end, None, accounts))
+        elif shard == 'year':
+            for year in range(start.year, end.year + 1):
+                shards.append((data_dir, max(start, datetime.date(year, 1, 1)),
+                               min(end, datetime.date(year, 12, 31)), None, ()))
+        else:
+            shards.append((data_dir, start, end, None, ()))
+    return shards
+
+def build_report(months, budgets, kinds=REPORT_KINDS, income_category='Salaire'):
+    """Met en forme (en euros) les agrégats mensuels d'un répertoire."""
+    def totals(by_category):
+        income = by_category.get(income_category, 0)
+        expense = sum(by_category.values()) - income
+        return {'income': income / 100, 'expense': expense / 100, 'net': (income - expense) / 100,
+                'categories': {c: cents / 100 for c, cents in sorted(by_category.items())}}
+
+    report = {}
+    if 'monthly' in kinds:
+        report['monthly'] = {f"{y}-{m:02d}": totals(by_category) for (y, m), by_category in sorted(months.items())}
+    if 'yearly' in kinds:
+        years = {}
+        for (year, month), by_category in months.items():
+            merged = years.setdefault(year, Counter())
+            merged.update(by_category)
+        report['yearly'] = {str(year): totals(by_category) for year, by_category in sorted(years.items())}
+    if 'categories' in kinds:
+        period = Counter()
+        for by_category in months.values():
+            period.update(by_category)
+        report['categories'] = {c: cents / 100 for c, cents in period.most_common()}
+    if 'budget' in kinds:
+        report['budget'] = {}
+        for (year, month), by_category in sorted(months.items()):
+            status = {}
+            for budget in budgets:
+                amount = float(budget['amount'])
+                if amount <= 0 or budget['category'] == income_category:
+                    continue
+                spent = by_category.get(budget['category'], 0) / 100
+                status[budget['category']] = {'budget': amount, 'spent': spent,
+                                              'remaining': round(amount - spent, 2),
+                                              'percent': round(spent / amount * 100, 1)}
+            report['budget'][f"{year}-{month:02d}"] = status
+    return report
+
+def run_reports(data_dirs, start, end, kinds=REPORT_KINDS, shard='none', workers=None):
+    """Calcule les rapports de plusieurs répertoires `fintrack_data`, en parallèle si `workers` > 1."""
+    shards = plan_report_shards(data_dirs, start, end, shard)
+    if workers == 1 or len(shards) == 1:
+        results = [report_shard(*args) for args in shards]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(report_shard, *zip(*shards)))
+
+    merged = {data_dir: {} for data_dir in data_dirs}
+    for data_dir, months in results:
+        for key, by_category in months.items():
+            target = merged[data_dir].setdefault(key, Counter())
+            target.update(by_category)
+    return {data_dir: build_report(months, read_only_data('budgets', data_dir, []), kinds)
+            for data_dir, months in merged.items()}
+
+def add_report_arguments(parser):
+    parser.add_argument("--data-dir", action="append", dest="data_dirs", metavar="DOSSIER",
+                        help="dossier fintrack_data à analyser (répétable ; défaut : celui de l'application)")
+    parser.add_argument("--year", default=str(datetime.date.today().year), metavar="AAAA[-AAAA]",
+                        help="année ou plage d'années (défaut : année en cours)")
+    parser.add_argument("--month", type=int, choices=range(1, 13), metavar="MM",
+                        help="limite le rapport à ce mois (une seule année)")
+    parser.add_argument("--kind", action="append", choices=REPORT_KINDS, dest="kinds",
+                        help="sections à produire (répétable ; défaut : toutes)")
+    parser.add_argument("--shard", choices=("none", "account", "year"), default="none",
+                        help="découpage du travail entre processus, en plus du découpage par dossier")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="nombre de processus (défaut : nombre de cœurs ; 1 = sans pool)")
+    parser.add_argument("--output", metavar="FICHIER", help="écrit le rapport JSON dans ce fichier")
+    return parser
+
+def run_report_cli(args):
+    """Point d'entrée de la sous-commande `report` ; renvoie le code de sortie."""
+    first_year, _, last_year = args.year.partition('-')
+    try:
+        first_year, last_year = int(first_year), int(last_year or first_year)
+    except ValueError:
+        print(f"Année invalide : {args.year}", file=sys.stderr)
+        return 2
+    if args.month and first_year != last_year:
+        print("--month exige une seule année.", file=sys.stderr)
+        return 2
+    if args.month:
+        start = datetime.date(first_year, args.month, 1)
+        end = datetime.date(first_year + args.month // 12, args.month % 12 + 1, 1) - datetime.timedelta(days=1)
+    else:
+        start, end = datetime.date(first_year, 1, 1), datetime.date(last_year, 12, 31)
+    data_dirs = [os.path.abspath(d) for d in (args.data_dirs or [os.path.dirname(get_app_data_path("transactions.json"))])]
+
+    reports = run_reports(data_dirs, start, end, tuple(args.kinds or REPORT_KINDS), args.shard, args.workers)
+    output = json.dumps({'period': {'start': start.isoformat(), 'end': end.isoformat()}, 'reports': reports},
+                        indent=4, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FinTrack AI - rapports sans interface graphique")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    add_report_arguments(subparsers.add_parser("report", help="rapports mensuels, annuels, budgets et catégories"))
+    sys.exit(run_report_cli(parser.parse_args()))
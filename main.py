@@ -1,115 +1,29 @@
+import time
+_MODULE_STARTED = time.perf_counter()
 import os
 import json
+import bisect
 import sys
+import argparse
+import statistics
+import subprocess
+import functools
+import csv
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 from tkcalendar import DateEntry
-from collections import defaultdict
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import numpy as np
 import datetime
-import time
-from dateutil.relativedelta import relativedelta
+import threading
+import queue
+from fintrack_core import (AccountManager, BudgetManager, RecurringManager, TransactionManager,
+                           RecurringScheduler, CsvImporter, ColumnarLedger, parse_date_ordinal, parse_cents,
+                           validate_transaction, add_report_arguments, run_report_cli, TRACE, traced,
+                           LedgerTrends, downsample_series)
+# matplotlib (module charts) et dateutil sont importés à la demande.
 
 # ==============================================================================
-# 1. GESTIONNAIRE DE CHEMINS & CLASSES DE DONNÉES (SANS CHIFFREMENT)
-# ==============================================================================
-
-def get_app_data_path(filename):
-    """Retourne un chemin sûr pour les fichiers de données."""
-    if getattr(sys, 'frozen', False):
-        base_path = os.path.dirname(sys.executable)
-    else:
-        base_path = os.path.dirname(os.path.abspath(__file__))
-    data_dir = os.path.join(base_path, 'fintrack_data')
-    os.makedirs(data_dir, exist_ok=True)
-    return os.path.join(data_dir, filename)
-
-class DataManager:
-    """Gère les données dans un fichier JSON simple (non chiffré)."""
-    def __init__(self, filename):
-        self.filename = get_app_data_path(f"{filename}.json")
-        self.data = self._load()
-
-    def _load(self):
-        if not os.path.exists(self.filename):
-            return self._get_default_data()
-        try:
-            with open(self.filename, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            return self._get_default_data()
-
-    def _save(self):
-        with open(self.filename, 'w', encoding='utf-8') as f:
-            json.dump(self.data, f, indent=4)
-
-    def _get_default_data(self):
-        return []
-
-class AccountManager(DataManager):
-    def __init__(self):
-        super().__init__("accounts")
-
-    def _get_default_data(self):
-        return ["Compte Courant", "Épargne"]
-
-class TransactionManager(DataManager):
-    def __init__(self):
-        super().__init__("transactions")
-
-    def add(self, transaction):
-        self.data.append(transaction)
-        self._sort_transactions()
-        self._save()
-
-    def delete(self, transaction_id):
-        self.data = [t for t in self.data if t.get('id') != transaction_id]
-        self._save()
-
-    def update(self, transaction_id, new_data):
-        for i, t in enumerate(self.data):
-            if t.get('id') == transaction_id:
-                self.data[i] = new_data
-                self._sort_transactions()
-                self._save()
-                return
-
-    def _sort_transactions(self):
-        if self.data:
-            self.data.sort(key=lambda x: datetime.datetime.strptime(x['date'], '%d-%m-%Y'), reverse=True)
-
-class BudgetManager(DataManager):
-    def __init__(self):
-        super().__init__("budgets")
-
-    def get_budget(self, category):
-        for budget in self.data:
-            if budget['category'] == category: return float(budget['amount'])
-        return 0.0
-
-    def set_budget(self, category, amount):
-        for budget in self.data:
-            if budget['category'] == category:
-                budget['amount'] = amount
-                self._save()
-                return
-        self.data.append({'category': category, 'amount': amount})
-        self._save()
-
-class RecurringManager(DataManager):
-    def __init__(self):
-        super().__init__("recurring")
-    # Les méthodes add/delete peuvent être ajoutées au besoin
-def add(self, recurring_data):
-        self.data.append(recurring_data)
-        self._save()
-
-def delete(self, recurring_id):
-        self.data = [r for r in self.data if r.get('id') != recurring_id]
-        self._save()
-# ==============================================================================
-# 2. FENÊTRES AUXILIAIRES (POPUPS)
+# 1. FENÊTRES AUXILIAIRES (POPUPS) & COMPOSANTS D'INTERFACE
 # ==============================================================================
 class BudgetWindow(tk.Toplevel):
     def __init__(self, parent):
@@ -146,19 +60,358 @@ class BudgetWindow(tk.Toplevel):
         except ValueError:
             messagebox.showerror("Erreur", "Veuillez entrer des montants valides.", parent=self)
 
+class DiagnosticsWindow(tk.Toplevel):
+    """Durées et compteurs des chemins chauds (voir fintrack_core.Instrumentation), rafraîchis chaque seconde."""
+    REFRESH_MS = 1000
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.title("Diagnostics")
+        self.geometry("720x480")
+        self.transient(parent)
+
+        controls = ttk.Frame(self, padding="10 10 10 0")
+        controls.pack(fill="x")
+        self.enabled_var = tk.BooleanVar(value=TRACE.enabled)
+        ttk.Checkbutton(controls, text="Mesures activées", variable=self.enabled_var,
+                        command=self.toggle).pack(side="left")
+        ttk.Button(controls, text="Exporter (JSON)...", command=self.export).pack(side="right")
+        ttk.Button(controls, text="Réinitialiser", command=self.reset).pack(side="right", padx=5)
+
+        columns = ("calls", "total_ms", "mean_ms", "max_ms")
+        self.tree = ttk.Treeview(self, columns=columns, show="tree headings")
+        self.tree.heading("#0", text="Mesure")
+        self.tree.column("#0", width=300)
+        for col, label in zip(columns, ("Appels", "Total (ms)", "Moyenne (ms)", "Max (ms)")):
+            self.tree.heading(col, text=label)
+            self.tree.column(col, width=90, anchor="e")
+        self.tree.pack(expand=True, fill="both", padx=10, pady=10)
+        self.spans_node = self.tree.insert("", tk.END, text="Durées", open=True)
+        self.counters_node = self.tree.insert("", tk.END, text="Compteurs", open=True)
+        self._refresh_after = None
+        self._poll()
+
+    def _poll(self):
+        self.refresh()
+        self._refresh_after = self.after(self.REFRESH_MS, self._poll)
+
+    def destroy(self):
+        if self._refresh_after is not None:
+            self.after_cancel(self._refresh_after)
+        super().destroy()
+
+    def refresh(self):
+        snapshot = TRACE.snapshot()
+        for node in (self.spans_node, self.counters_node):
+            self.tree.delete(*self.tree.get_children(node))
+        for name, stats in sorted(snapshot['spans'].items(), key=lambda item: -item[1]['total_ms']):
+            self.tree.insert(self.spans_node, tk.END, text=name, values=(
+                stats['calls'], f"{stats['total_ms']:.1f}", f"{stats['mean_ms']:.2f}", f"{stats['max_ms']:.2f}"))
+        for name, value in sorted(snapshot['counters'].items()):
+            self.tree.insert(self.counters_node, tk.END, text=name, values=(value, "", "", ""))
+
+    def toggle(self):
+        TRACE.enabled = self.enabled_var.get()
+
+    def reset(self):
+        TRACE.reset()
+        self.refresh()
+
+    def export(self):
+        path = filedialog.asksaveasfilename(parent=self, title="Exporter les diagnostics", defaultextension=".json",
+                                            filetypes=[("Fichiers JSON", "*.json")])
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(TRACE.snapshot(), f, indent=4, ensure_ascii=False)
+
+class BackgroundWorker:
+    """Thread de travail unique ; seule la dernière tâche soumise compte.
+
+    `submit` remplace toute tâche encore en attente (les demandes rapprochées
+    sont ainsi fusionnées) ; la tâche reçoit `is_stale()` pour abandonner si
+    une demande plus récente est arrivée entre-temps. Le résultat revient au
+    thread Tk par scrutation `after()`, et seul celui de la dernière demande
+    est transmis à son callback.
+    """
+    POLL_MS = 30
+
+    def __init__(self, widget):
+        self.widget = widget
+        self.generation = 0
+        self._delivered = 0
+        self._pending = None
+        self._condition = threading.Condition()
+        self._results = queue.SimpleQueue()
+        self._poll_id = None
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, task, callback):
+        """`task(is_stale)` s'exécute sur le thread de travail, `callback(résultat)` sur le thread Tk."""
+        with self._condition:
+            self.generation += 1
+            self._pending = (self.generation, task, callback)
+            self._condition.notify()
+        if self._poll_id is None:
+            self._poll_id = self.widget.after(self.POLL_MS, self._poll)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None:
+                    self._condition.wait()
+                generation, task, callback = self._pending
+                self._pending = None
+            is_stale = lambda: generation != self.generation
+            try:
+                self._results.put((generation, callback, task(is_stale), None))
+            except Exception as error:
+                self._results.put((generation, callback, None, error))
+
+    def _poll(self):
+        self._poll_id = None
+        while not self._results.empty():
+            generation, callback, result, error = self._results.get()
+            if generation != self.generation:
+                continue
+            self._delivered = generation
+            if error is not None:
+                raise error
+            callback(result)
+        if self._delivered != self.generation:
+            self._poll_id = self.widget.after(self.POLL_MS, self._poll)
+
+    def cancel(self):
+        """Abandonne la tâche en attente et écarte le résultat de celle en cours."""
+        with self._condition:
+            self.generation += 1
+            self._pending = None
+        self._delivered = self.generation
+
+class TransactionListView:
+    """Historique virtualisé : seules les lignes affichées existent dans le Treeview.
+
+    La vue garde l'ordre complet des transactions (`order`, par clé croissante,
+    avec `keys` en parallèle) mais ne matérialise que les `loaded` premières
+    lignes affichées, puis une page de plus quand le défilement approche du
+    bas. En tri décroissant, l'affichage parcourt `order` à l'envers. Les
+    mutations unitaires deviennent une insertion, une suppression ou un
+    déplacement ciblé dans le widget. Quand un filtre de recherche est actif,
+    la vue ne montre que `filtered` et chaque mutation relance `refilter`.
+    """
+    PAGE_SIZE = 200
+
+    def __init__(self, tree, scrollbar, manager=None, refilter=None):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.manager = manager
+        self.refilter = refilter
+        self.filtered = None
+        self.sort_column, self.descending = 'date', True
+        self.order, self.keys, self.loaded = [], [], 0
+        self._loading = False
+        self.columns = tree['columns']
+        self.tree.configure(yscrollcommand=self._on_yscroll)
+        for col in self.columns[1:]:
+            self.tree.heading(col, text=col.capitalize(), command=lambda c=col: self.sort_by(c))
+        self._update_headings()
+
+    def attach(self, manager):
+        """Branche la vue sur le gestionnaire une fois celui-ci chargé."""
+        self.manager = manager
+        self.reset()
+
+    @traced('TransactionListView.reset')
+    def reset(self):
+        """Recalcule l'ordre complet et rematérialise la première page."""
+        self._build_order()
+        self.tree.delete(*self.tree.get_children())
+        self.loaded = 0
+        self._load_more()
+        self.tree.yview_moveto(0)
+
+    def set_filter(self, transactions):
+        """Restreint la vue à `transactions` (plus récentes d'abord), ou lève le filtre avec None."""
+        self.filtered = transactions
+        self.reset()
+
+    def _build_order(self):
+        if self.filtered is not None:
+            data = self.filtered
+        else:
+            data = self.manager.data if self.manager is not None else []
+        if self.sort_column == 'date':
+            # `data` est déjà trié par date décroissante : inutile de retrier.
+            self.order = data[::-1]
+            self.keys = self._bulk_keys(self.order)
+        else:
+            keys = self._bulk_keys(data)
+            if isinstance(keys, np.ndarray):
+                indexes = np.argsort(keys, kind='stable')
+                self.order = [data[i] for i in indexes.tolist()]
+                self.keys = keys[indexes].tolist()
+            else:
+                indexes = sorted(range(len(data)), key=keys.__getitem__)
+                self.order = [data[i] for i in indexes]
+                self.keys = [keys[i] for i in indexes]
+        if isinstance(self.keys, np.ndarray):
+            self.keys = self.keys.tolist()
+
+    def _load_archive(self):
+        """Bas de l'historique chargé atteint : charge l'année archivée suivante."""
+        self._loading = False
+        # Une année peut n'apporter aucune ligne (déjà en mémoire, ou vidée par des modifications) :
+        # on passe à la suivante, sinon la vue ne bouge pas et plus aucun défilement ne la relancerait.
+        loaded = []
+        for year in self.manager.archived_years():
+            loaded = self.manager.load_archive(year)
+            if loaded:
+                break
+        if not loaded:
+            return
+        shown = [self.order[self._display_index(i)] for i in range(self.loaded)]
+        self._build_order()
+        if all(self.order[self._display_index(i)] is t for i, t in enumerate(shown)):
+            # Cas courant (tri par date décroissante) : l'archive se place après les lignes affichées.
+            self._load_more()
+        else:
+            self.reset()
+
+    def sort_by(self, column):
+        if column == self.sort_column:
+            self.descending = not self.descending
+        else:
+            self.sort_column, self.descending = column, column in ('date', 'amount')
+        self._update_headings()
+        self.reset()
+
+    def insert(self, transaction):
+        if self.filtered is not None:
+            self.refilter()
+            return
+        key = self._key(transaction)
+        index = bisect.bisect_left(self.keys, key)
+        self.keys.insert(index, key)
+        self.order.insert(index, transaction)
+        position = self._display_index(index)
+        if position < self.loaded or self.loaded == len(self.order) - 1:
+            self.tree.insert("", position, iid=transaction['id'], values=self._values(transaction))
+            self.loaded += 1
+            TRACE.count('tree_rows_inserted')
+
+    def remove(self, transaction):
+        if self.filtered is not None:
+            self.refilter()
+            return
+        index = self._locate(transaction)
+        if index is None:
+            return
+        position = self._display_index(index)
+        del self.keys[index]
+        del self.order[index]
+        if position < self.loaded:
+            self.tree.delete(transaction['id'])
+            self.loaded -= 1
+            TRACE.count('tree_rows_deleted')
+
+    def replace(self, old_transaction, new_transaction):
+        if self.filtered is not None:
+            self.refilter()
+            return
+        if (old_transaction.get('id') == new_transaction.get('id')
+                and self._key(old_transaction) == self._key(new_transaction)):
+            # Même clé de tri : la ligne reste en place, seules ses valeurs changent.
+            index = self._locate(old_transaction)
+            if index is None:
+                self.insert(new_transaction)
+                return
+            self.order[index] = new_transaction
+            if self._display_index(index) < self.loaded:
+                self.tree.item(new_transaction['id'], values=self._values(new_transaction))
+            return
+        self.remove(old_transaction)
+        self.insert(new_transaction)
+
+    def _locate(self, transaction):
+        """Indice de `transaction` dans `order`, ou None si elle n'y figure pas."""
+        transaction_id = transaction.get('id')
+        key = self._key(transaction)
+        index = bisect.bisect_left(self.keys, key)
+        while index < len(self.order) and self.keys[index] == key:
+            if self.order[index].get('id') == transaction_id:
+                return index
+            index += 1
+        # Clé introuvable (donnée ancienne mal formée) : recherche linéaire par identifiant.
+        return next((i for i, t in enumerate(self.order) if t.get('id') == transaction_id), None)
+
+    def _display_index(self, index):
+        return len(self.order) - 1 - index if self.descending else index
+
+    def _load_more(self):
+        self._loading = False
+        end = min(self.loaded + self.PAGE_SIZE, len(self.order))
+        for position in range(self.loaded, end):
+            t = self.order[self._display_index(position)]
+            self.tree.insert("", tk.END, iid=t['id'], values=self._values(t))
+        TRACE.count('tree_rows_inserted', end - self.loaded)
+        self.loaded = end
+
+    def _on_yscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if float(last) >= 0.9 and not self._loading and self.manager is not None:
+            if self.loaded < len(self.order):
+                self._loading = True
+                self.tree.after_idle(self._load_more)
+            elif self.manager.archived_years():
+                self._loading = True
+                self.tree.after_idle(self._load_archive)
+
+    def _values(self, t):
+        return tuple(t.get(col, '') for col in self.columns)
+
+    def _key(self, t):
+        # Même analyse que celle qui remplit les colonnes lues par `_bulk_keys`. La transaction
+        # peut déjà avoir quitté le stockage colonnaire (suppression, modification) : on ne l'y lit pas.
+        if self.sort_column == 'date':
+            return ColumnarLedger.parse(t)[0]
+        if self.sort_column == 'amount':
+            return ColumnarLedger.parse(t)[1]
+        return str(t.get(self.sort_column, '')).casefold()
+
+    def _bulk_keys(self, transactions):
+        """Clés de tri de toute la liste ; dates et montants lus dans le stockage colonnaire."""
+        if self.sort_column not in ('date', 'amount'):
+            return [self._key(t) for t in transactions]
+        columns = self.manager.columns
+        rows = np.fromiter((columns.rows[t['id']] for t in transactions), dtype=np.int64, count=len(transactions))
+        return (columns.dates if self.sort_column == 'date' else columns.cents)[rows]
+
+    def _update_headings(self):
+        for col in self.columns[1:]:
+            arrow = (" ▼" if self.descending else " ▲") if col == self.sort_column else ""
+            self.tree.heading(col, text=col.capitalize() + arrow)
+
 # ==============================================================================
-# 3. CLASSE PRINCIPALE DE L'APPLICATION
+# 2. CLASSE PRINCIPALE DE L'APPLICATION
 # ==============================================================================
 class FinTrackApp(tk.Tk):
-    def __init__(self):
+    DASHBOARD_DEBOUNCE_MS = 120
+    DASHBOARD_CACHE_SIZE = 8
+    SEARCH_DEBOUNCE_MS = 150
+
+    def __init__(self, data_dir=None, interactive=True):
         super().__init__()
+        self.data_dir = data_dir
+        # Hors interactif (mesure du démarrage), aucune boîte de dialogue bloquante.
+        self.interactive = interactive
+        self.startup_times = {'import': _MODULE_LOADED - _MODULE_STARTED}
         self.selected_item_id = None
+        self._dashboard_after = None
+        self.canvas = None
+        self.trends_canvas = None
         
-        # Init Managers (sans CryptoManager)
-        self.account_manager = AccountManager()
-        self.budget_manager = BudgetManager()
-        self.recurring_manager = RecurringManager()
-        self.transaction_manager = TransactionManager()
+        # Seuls les comptes servent au premier affichage ; les autres
+        # gestionnaires sont chargés à la demande (voir les propriétés ci-dessous).
+        self.account_manager = AccountManager(self.data_dir)
         
         # Window Setup
         self.title("FinTrack AI - Gestionnaire de Finances")
@@ -179,8 +432,32 @@ class FinTrackApp(tk.Tk):
         self.categories = ["Alimentation", "Transport", "Loisirs", "Factures", "Santé", "Éducation", "Salaire", "Autres"]
 
         self.create_widgets()
+        self.after_idle(self._on_first_paint)
+
+    # Gestionnaires chargés paresseusement, au premier accès.
+    @functools.cached_property
+    def transaction_manager(self):
+        return TransactionManager(self.data_dir)
+
+    @functools.cached_property
+    def budget_manager(self):
+        return BudgetManager(self.data_dir)
+
+    @functools.cached_property
+    def recurring_manager(self):
+        return RecurringManager(self.data_dir)
+
+    def _on_first_paint(self):
+        self.update_idletasks()
+        self.startup_times['first_paint'] = time.perf_counter() - _MODULE_STARTED
+        self.after(1, self._finish_startup)
+
+    def _finish_startup(self):
+        """Après le premier affichage : charge l'historique puis les récurrences."""
+        self.history.attach(self.transaction_manager)
         self.process_recurring_transactions()
-        self.refresh_treeview()
+        self.startup_times['ready'] = time.perf_counter() - _MODULE_STARTED
+        self.event_generate("<<StartupComplete>>")
 
     def create_widgets(self):
         menubar = tk.Menu(self)
@@ -188,6 +465,9 @@ class FinTrackApp(tk.Tk):
         file_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Fichier", menu=file_menu)
         file_menu.add_command(label="Gérer les Budgets", command=self.open_budget_window)
+        file_menu.add_command(label="Importer un relevé CSV...", command=self.import_csv)
+        file_menu.add_command(label="Charger l'historique archivé", command=self.load_full_history)
+        file_menu.add_command(label="Diagnostics", command=self.open_diagnostics_window)
         file_menu.add_separator()
         file_menu.add_command(label="Quitter", command=self.on_closing)
 
@@ -197,10 +477,11 @@ class FinTrackApp(tk.Tk):
         self.notebook.add(self.transactions_tab, text="Transactions")
         self.viz_tab = ttk.Frame(self.notebook)
         self.notebook.add(self.viz_tab, text="Tableau de Bord")
+        self.trends_tab = ttk.Frame(self.notebook)
+        self.notebook.add(self.trends_tab, text="Tendances")
         self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
 
         self.create_transactions_widgets()
-        self.create_viz_widgets()
 
     def create_transactions_widgets(self):
         main_frame = ttk.Frame(self.transactions_tab, padding="10")
@@ -241,12 +522,35 @@ class FinTrackApp(tk.Tk):
         ttk.Button(tree_actions_frame, text="Modifier la sélection", style="Warning.TButton", command=self.edit_selected_transaction).pack(side="left")
         ttk.Button(tree_actions_frame, text="Supprimer la sélection", style="Danger.TButton", command=self.delete_selected_transaction).pack(side="left", padx=10)
         
+        search_frame = ttk.LabelFrame(main_frame, text="Recherche", padding="10")
+        search_frame.pack(fill="x", pady=(10, 0))
+        self.search_vars = {name: tk.StringVar() for name in ('text', 'min_amount', 'max_amount', 'start', 'end')}
+        self.search_vars['category'] = tk.StringVar(value="Toutes les catégories")
+        self.search_vars['account'] = tk.StringVar(value="Tous les comptes")
+        ttk.Label(search_frame, text="Texte :").grid(row=0, column=0, sticky="w", padx=5)
+        ttk.Entry(search_frame, textvariable=self.search_vars['text'], width=25).grid(row=0, column=1, padx=5)
+        ttk.Label(search_frame, text="Montant :").grid(row=0, column=2, sticky="w", padx=5)
+        ttk.Entry(search_frame, textvariable=self.search_vars['min_amount'], width=8).grid(row=0, column=3)
+        ttk.Label(search_frame, text="à").grid(row=0, column=4, padx=2)
+        ttk.Entry(search_frame, textvariable=self.search_vars['max_amount'], width=8).grid(row=0, column=5)
+        ttk.Label(search_frame, text="Du (jj-mm-aaaa) :").grid(row=0, column=6, sticky="w", padx=5)
+        ttk.Entry(search_frame, textvariable=self.search_vars['start'], width=11).grid(row=0, column=7)
+        ttk.Label(search_frame, text="au").grid(row=0, column=8, padx=2)
+        ttk.Entry(search_frame, textvariable=self.search_vars['end'], width=11).grid(row=0, column=9)
+        ttk.Combobox(search_frame, textvariable=self.search_vars['category'], state="readonly", width=18,
+                     values=["Toutes les catégories"] + self.categories).grid(row=0, column=10, padx=5)
+        ttk.Combobox(search_frame, textvariable=self.search_vars['account'], state="readonly", width=18,
+                     values=["Tous les comptes"] + self.account_manager.data).grid(row=0, column=11, padx=5)
+        self.chips_frame = ttk.Frame(search_frame)
+        self.chips_frame.grid(row=1, column=0, columnspan=12, sticky="w", pady=(8, 0))
+        for var in self.search_vars.values():
+            var.trace_add('write', lambda *args: self.schedule_search())
+        self._search_after = None
+
         tree_frame = ttk.LabelFrame(main_frame, text="Historique des Transactions", padding="10")
         tree_frame.pack(expand=True, fill="both", pady=10)
         columns = ("id", "date", "description", "amount", "category", "account")
         self.tree = ttk.Treeview(tree_frame, columns=columns, show="headings", displaycolumns=columns[1:])
-        
-        for col in columns[1:]: self.tree.heading(col, text=col.capitalize())
         self.tree.column("amount", anchor="e", width=100)
         self.tree.column("date", anchor="center", width=100)
         self.tree.column("category", anchor="center", width=120)
@@ -254,11 +558,15 @@ class FinTrackApp(tk.Tk):
         self.tree.pack(side="left", expand=True, fill="both")
         
         scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
         scrollbar.pack(side="right", fill="y")
+        self.history = TransactionListView(self.tree, scrollbar, refilter=self.apply_search)
         self.clear_entries()
 
     def create_viz_widgets(self):
+        # Import différé : matplotlib n'est chargé qu'à la première ouverture du tableau de bord.
+        from matplotlib.figure import Figure
+        from charts import ThreadedCanvas
+
         self.viz_main_frame = ttk.Frame(self.viz_tab, padding="10")
         self.viz_main_frame.pack(expand=True, fill="both")
         
@@ -269,8 +577,13 @@ class FinTrackApp(tk.Tk):
         self.account_filter_cb.current(0)
         self.account_filter_cb.pack(side="left", padx=5)
         self.account_filter_cb.bind("<<ComboboxSelected>>", self.on_tab_changed)
+        ttk.Label(filter_frame, text="Mois :").pack(side="left", padx=5)
+        self.month_filter_cb = ttk.Combobox(filter_frame, values=[datetime.date.today().strftime('%m-%Y')], width=10, state="readonly")
+        self.month_filter_cb.current(0)
+        self.month_filter_cb.pack(side="left", padx=5)
+        self.month_filter_cb.bind("<<ComboboxSelected>>", self.on_tab_changed)
 
-        stats_frame = ttk.LabelFrame(self.viz_main_frame, text="Résumé du Mois en Cours", padding="15")
+        stats_frame = ttk.LabelFrame(self.viz_main_frame, text="Résumé du Mois", padding="15")
         stats_frame.pack(fill="x", pady=(10, 10))
         self.total_income_label = ttk.Label(stats_frame, text="Revenus: 0.00 €", font=("Helvetica", 12, "bold"), foreground="green")
         self.total_income_label.pack(side="left", expand=True)
@@ -281,56 +594,125 @@ class FinTrackApp(tk.Tk):
 
         self.budget_frame = ttk.LabelFrame(self.viz_main_frame, text="Suivi des Budgets du Mois", padding="15")
         self.budget_frame.pack(fill="x", pady=(0, 20))
+        # Lignes de budget créées une fois, puis mises à jour sur place.
+        self.budget_rows = {}
 
         charts_frame = ttk.Frame(self.viz_main_frame)
         charts_frame.pack(expand=True, fill="both")
         self.fig = Figure(figsize=(10, 6), dpi=100, tight_layout=True)
         self.ax_pie = self.fig.add_subplot(1, 1, 1)
-        self.canvas = FigureCanvasTkAgg(self.fig, master=charts_frame)
+        self.ax_pie.set_axis_off()
+        self.pie_empty_text = self.ax_pie.text(0.5, 0.5, "Aucune dépense à afficher", ha="center", va="center",
+                                               transform=self.ax_pie.transAxes)
+        self.pie_artists, self.pie_expenses = [], {}
+        self.canvas = ThreadedCanvas(self.fig, master=charts_frame)
         self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
         self.canvas.draw()
+        self.dashboard_worker = BackgroundWorker(self)
+        # (compte, année, mois, version des agrégats, taille) -> (résultat, image rastérisée)
+        self.dashboard_cache = {}
     
+    def create_trend_widgets(self):
+        from matplotlib.figure import Figure
+        from charts import ThreadedCanvas
+
+        main_frame = ttk.Frame(self.trends_tab, padding="10")
+        main_frame.pack(expand=True, fill="both")
+        filter_frame = ttk.Frame(main_frame)
+        filter_frame.pack(fill="x", pady=5)
+        ttk.Label(filter_frame, text="Compte :").pack(side="left", padx=5)
+        self.trends_account_cb = ttk.Combobox(filter_frame, values=["Tous les comptes"] + self.account_manager.data, state="readonly")
+        self.trends_account_cb.current(0)
+        self.trends_account_cb.pack(side="left", padx=5)
+        self.trends_account_cb.bind("<<ComboboxSelected>>", lambda event: self.schedule_trends_update())
+        ttk.Label(filter_frame, text="Moyenne glissante (mois) :").pack(side="left", padx=5)
+        self.trends_window_cb = ttk.Combobox(filter_frame, values=["3", "6", "12"], width=5, state="readonly")
+        self.trends_window_cb.current(0)
+        self.trends_window_cb.pack(side="left", padx=5)
+        self.trends_window_cb.bind("<<ComboboxSelected>>", lambda event: self.schedule_trends_update())
+
+        self.trends_fig = Figure(figsize=(10, 8), dpi=100, tight_layout=True)
+        self.ax_balance = self.trends_fig.add_subplot(3, 1, 1)
+        self.ax_monthly = self.trends_fig.add_subplot(3, 1, 2, sharex=self.ax_balance)
+        self.ax_rolling = self.trends_fig.add_subplot(3, 1, 3, sharex=self.ax_balance)
+        self.trends_canvas = ThreadedCanvas(self.trends_fig, master=main_frame)
+        self.trends_canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        self.trends_canvas.draw()
+        self.trends_worker = BackgroundWorker(self)
+        self._trends_after = None
+
+    def schedule_trends_update(self):
+        if self._trends_after is not None:
+            self.after_cancel(self._trends_after)
+        self._trends_after = self.after(self.DASHBOARD_DEBOUNCE_MS, self.update_trends)
+
+    def update_trends(self):
+        """Séries vectorisées puis tracé, ramenés à la largeur en pixels des axes, sur le thread de travail."""
+        self._trends_after = None
+        selected_account = self.trends_account_cb.get()
+        account = None if selected_account == "Tous les comptes" else selected_account
+        window = int(self.trends_window_cb.get())
+        manager = self.transaction_manager
+        canvas = self.trends_canvas
+
+        @traced('FinTrackApp.update_trends (calcul)')
+        def compute(is_stale):
+            with manager.lock:
+                trends = LedgerTrends(manager.columns, account)
+            days, balances = trends.running_balances()
+            months, income, expense = trends.monthly_income_expense()
+            _, averages = trends.rolling_category_averages(window)
+            if is_stale():
+                return None
+            with canvas.render_lock:
+                width = self.ax_balance.bbox.width
+                for ax in (self.ax_balance, self.ax_monthly, self.ax_rolling):
+                    ax.clear()
+                for name, balance in balances.items():
+                    self.ax_balance.plot(*downsample_series(days, balance, width), label=name, linewidth=1)
+                self.ax_balance.set_title(f"Solde cumulé par compte ({selected_account})")
+                month_days = months.astype('datetime64[D]')
+                self.ax_monthly.bar(month_days - np.timedelta64(4, 'D'), income, width=8, color="#28a745", label="Revenus")
+                self.ax_monthly.bar(month_days + np.timedelta64(4, 'D'), expense, width=8, color="#dc3545", label="Dépenses")
+                self.ax_monthly.set_title("Revenus et dépenses mensuels")
+                for name, average in averages.items():
+                    self.ax_rolling.plot(month_days, average, label=name, linewidth=1)
+                self.ax_rolling.set_title(f"Dépenses par catégorie, moyenne glissante sur {window} mois")
+                for ax in (self.ax_balance, self.ax_monthly, self.ax_rolling):
+                    if ax.has_data():
+                        ax.legend(loc="upper left", fontsize=8)
+                    else:
+                        ax.text(0.5, 0.5, "Aucune transaction à afficher", ha="center", va="center", transform=ax.transAxes)
+                canvas.render_offscreen()
+            return True
+
+        self.trends_worker.submit(compute, lambda result: canvas.blit())
+
+    @traced('FinTrackApp.process_recurring_transactions')
     def process_recurring_transactions(self):
-        today = datetime.date.today()
-        made_changes = False
-        for recurring in self.recurring_manager.data:
-            next_date = datetime.datetime.strptime(recurring['next_date'], '%d-%m-%Y').date()
-            if next_date <= today:
-                new_trans = {
-                    'id': f"trans_{int(time.time() * 1000)}",
-                    "date": next_date.strftime('%d-%m-%Y'),
-                    "description": recurring['description'], "amount": recurring['amount'],
-                    "category": recurring['category'], "account": recurring['account']
-                }
-                self.transaction_manager.add(new_trans)
-                if recurring['frequency'] == 'Mensuel':
-                    next_date += relativedelta(months=1)
-                recurring['next_date'] = next_date.strftime('%d-%m-%Y')
-                made_changes = True
-        if made_changes:
-            self.recurring_manager._save()
-            messagebox.showinfo("Transactions Récurrentes", "Des transactions récurrentes ont été ajoutées.")
+        generated = RecurringScheduler(self.recurring_manager, self.transaction_manager).catch_up()
+        if generated:
+            self.refresh_treeview()
+            if self.interactive:
+                messagebox.showinfo("Transactions Récurrentes", f"{len(generated)} transaction(s) récurrente(s) ont été ajoutées.")
 
     def add_new_transaction(self):
         new_trans = {
-            'id': f"trans_{int(time.time() * 1000)}_{len(self.transaction_manager.data)}",
+            'id': self.transaction_manager.new_id(),
             "date": self.date_entry.get(),
             "description": self.desc_entry.get(),
             "amount": self.amount_entry.get().replace(',', '.'),
             "category": self.category_combobox.get(),
             "account": self.account_combobox.get()
         }
-        if not all([new_trans['description'], new_trans['amount'], new_trans['category'], new_trans['account']]):
-            messagebox.showerror("Erreur", "Tous les champs sauf l'ID sont requis.")
-            return
         try:
-            float(new_trans['amount'])
-        except ValueError:
-            messagebox.showerror("Erreur", "Le montant doit être un nombre valide.")
+            validate_transaction(new_trans)
+        except ValueError as error:
+            messagebox.showerror("Erreur", str(error))
             return
 
         self.transaction_manager.add(new_trans)
-        self.refresh_treeview()
+        self.history.insert(new_trans)
         self.clear_entries()
 
     def edit_selected_transaction(self):
@@ -339,15 +721,15 @@ class FinTrackApp(tk.Tk):
             messagebox.showwarning("Sélection requise", "Veuillez sélectionner une transaction à modifier.")
             return
         
-        self.selected_item_id = selected_iid
-        item_data = self.tree.item(selected_iid, "values")
+        transaction = self.transaction_manager.get(selected_iid)
         self.clear_entries()
+        self.selected_item_id = selected_iid
         
-        self.date_entry.set_date(datetime.datetime.strptime(item_data[1], '%d-%m-%Y'))
-        self.desc_entry.insert(0, item_data[2])
-        self.amount_entry.insert(0, item_data[3])
-        self.category_combobox.set(item_data[4])
-        self.account_combobox.set(item_data[5])
+        self.date_entry.set_date(datetime.datetime.strptime(transaction['date'], '%d-%m-%Y'))
+        self.desc_entry.insert(0, transaction['description'])
+        self.amount_entry.insert(0, transaction['amount'])
+        self.category_combobox.set(transaction['category'])
+        self.account_combobox.set(transaction['account'])
         
         self.add_button.pack_forget()
         self.save_button.pack(side="left", padx=5)
@@ -362,8 +744,18 @@ class FinTrackApp(tk.Tk):
             "category": self.category_combobox.get(),
             "account": self.account_combobox.get()
         }
+        try:
+            validate_transaction(updated_trans)
+        except ValueError as error:
+            messagebox.showerror("Erreur", str(error))
+            return
+        old_trans = self.transaction_manager.get(self.selected_item_id)
+        if old_trans is None:
+            # Transaction supprimée entre-temps : rien à modifier.
+            self.clear_entries()
+            return
         self.transaction_manager.update(self.selected_item_id, updated_trans)
-        self.refresh_treeview()
+        self.history.replace(old_trans, updated_trans)
         self.clear_entries()
 
     def delete_selected_transaction(self):
@@ -372,8 +764,12 @@ class FinTrackApp(tk.Tk):
             messagebox.showwarning("Sélection requise", "Veuillez sélectionner une transaction à supprimer.")
             return
         if messagebox.askyesno("Confirmation", "Voulez-vous vraiment supprimer cette transaction ?"):
+            old_trans = self.transaction_manager.get(selected_iid)
             self.transaction_manager.delete(selected_iid)
-            self.refresh_treeview()
+            self.history.remove(old_trans)
+            if selected_iid == self.selected_item_id:
+                # La transaction en cours de modification n'existe plus.
+                self.clear_entries()
             self.update_dashboard()
 
     def clear_entries(self):
@@ -386,72 +782,312 @@ class FinTrackApp(tk.Tk):
         self.save_button.pack_forget()
         self.add_button.pack(side="left", padx=5)
 
+    @traced('FinTrackApp.refresh_treeview')
     def refresh_treeview(self):
-        for i in self.tree.get_children(): self.tree.delete(i)
-        for t in self.transaction_manager.data:
-            self.tree.insert("", tk.END, values=(t['id'], t['date'], t['description'], t['amount'], t['category'], t['account']), iid=t['id'])
+        if self.history.filtered is not None:
+            self.apply_search()
+        else:
+            self.history.reset()
+
+    def schedule_search(self):
+        """Relance la recherche à chaque frappe, une fois la saisie posée."""
+        if self._search_after is not None:
+            self.after_cancel(self._search_after)
+        self._search_after = self.after(self.SEARCH_DEBOUNCE_MS, self.apply_search)
+
+    def search_criteria(self):
+        """Critères valides de la barre de recherche et leurs pastilles (libellé, variable à vider)."""
+        values = {name: var.get().strip() for name, var in self.search_vars.items()}
+        criteria, chips = {}, []
+        if values['text']:
+            criteria['text'] = values['text']
+            chips.append((f"Texte : {values['text']}", 'text'))
+        for name, key, label in (('min_amount', 'min_cents', "Montant ≥"), ('max_amount', 'max_cents', "Montant ≤")):
+            if values[name]:
+                try:
+                    criteria[key] = parse_cents(values[name])
+                except ValueError:
+                    continue
+                chips.append((f"{label} {values[name]} €", name))
+        for name, label in (('start', "Depuis le"), ('end', "Jusqu'au")):
+            if values[name]:
+                try:
+                    criteria[name] = datetime.date.fromordinal(parse_date_ordinal(values[name]))
+                except ValueError:
+                    continue
+                chips.append((f"{label} {values[name]}", name))
+        if values['category'] != "Toutes les catégories":
+            criteria['category'] = values['category']
+            chips.append((f"Catégorie : {values['category']}", 'category'))
+        if values['account'] != "Tous les comptes":
+            criteria['account'] = values['account']
+            chips.append((f"Compte : {values['account']}", 'account'))
+        return criteria, chips
+
+    def apply_search(self):
+        self._search_after = None
+        criteria, chips = self.search_criteria()
+        for widget in self.chips_frame.winfo_children(): widget.destroy()
+        if not criteria:
+            if self.history.filtered is not None:
+                self.history.set_filter(None)
+            return
+        manager = self.transaction_manager
+        if manager.archived_years():
+            # La recherche porte sur tout l'historique.
+            manager.load_history()
+        results = manager.search(**criteria)
+        self.history.set_filter(results)
+        ttk.Label(self.chips_frame, text=f"{len(results)} résultat(s) :").pack(side="left", padx=(0, 5))
+        for label, name in chips:
+            ttk.Button(self.chips_frame, text=f"{label}  ✕", command=lambda n=name: self.clear_search(n)).pack(side="left", padx=2)
+        ttk.Button(self.chips_frame, text="Tout effacer", command=self.clear_search).pack(side="left", padx=(10, 0))
+
+    def clear_search(self, name=None):
+        defaults = {'category': "Toutes les catégories", 'account': "Tous les comptes"}
+        for key in ([name] if name else self.search_vars):
+            self.search_vars[key].set(defaults.get(key, ""))
+
+    def schedule_dashboard_update(self):
+        """Regroupe les changements d'onglet ou de filtre rapprochés en une seule mise à jour."""
+        if self._dashboard_after is not None:
+            self.after_cancel(self._dashboard_after)
+        self._dashboard_after = self.after(self.DASHBOARD_DEBOUNCE_MS, self.update_dashboard)
 
     def update_dashboard(self):
+        """Affiche le tableau de bord, depuis le cache de rendu ou via le thread de travail.
+
+        Une vue déjà rendue pour le même compte, le même mois, la même version
+        des agrégats et la même taille de canevas est restaurée telle quelle :
+        ni calcul ni rastérisation.
+        """
+        self._dashboard_after = None
+        if self.canvas is None:
+            return
         selected_account = self.account_filter_cb.get()
-        transactions = self.transaction_manager.data
-        if selected_account != "Tous les comptes":
-            transactions = [t for t in transactions if t['account'] == selected_account]
+        account = None if selected_account == "Tous les comptes" else selected_account
+        selected_month = self.month_filter_cb.get()
+        month, year = (int(part) for part in selected_month.split('-'))
+        title = f"Répartition des Dépenses {selected_month} ({selected_account})"
+        manager = self.transaction_manager
 
-        now = datetime.datetime.now()
-        income, expense = 0.0, 0.0
-        monthly_expenses_cat = defaultdict(float)
+        key = (account, year, month, manager.rollups.version, self.canvas.get_width_height())
+        cached = self.dashboard_cache.pop(key, None)
+        if cached is not None:
+            self.dashboard_cache[key] = cached
+            TRACE.count('dashboard_cache_hits')
+            result, region = cached
+            # Un rendu en cours porterait sur une vue périmée : on l'écarte.
+            self.dashboard_worker.cancel()
+            with self.canvas.render_lock:
+                # Les artistes doivent refléter l'image restaurée (redimensionnement, redessin).
+                self._draw_expense_pie(result[3], title)
+                self.canvas.restore_region(region)
+            self._show_dashboard((result, None, None))
+            return
 
-        for t in transactions:
-            try:
-                trans_date = datetime.datetime.strptime(t['date'], '%d-%m-%Y')
-                amount = abs(float(str(t['amount']).replace(',', '.')))
-                if trans_date.month == now.month and trans_date.year == now.year:
-                    if t['category'] == 'Salaire': income += amount
-                    else: expense += amount
-                if t['category'] != 'Salaire': monthly_expenses_cat[t['category']] += amount
-            except (ValueError, KeyError): continue
+        @traced('FinTrackApp.update_dashboard (calcul)')
+        def compute(is_stale):
+            with manager.lock:
+                version = manager.rollups.version
+                months = manager.rollups.months(account)
+                income_cents, expense_cents = manager.rollups.totals(year, month, account)
+                by_category = manager.rollups.month(year, month, account)
+            monthly_expenses_cat = {category: cents / 100 for category, cents in by_category.items()
+                                    if category != 'Salaire'}
+            with self.canvas.render_lock:
+                if is_stale():
+                    return None
+                self._draw_expense_pie(monthly_expenses_cat, title)
+                self.canvas.render_offscreen()
+                region = self.canvas.copy_from_bbox(self.fig.bbox)
+                size = self.canvas.get_width_height()
+            result = (months, income_cents / 100, expense_cents / 100, monthly_expenses_cat)
+            return result, (account, year, month, version, size), region
+
+        self.dashboard_worker.submit(compute, self._show_dashboard)
+
+    def _draw_expense_pie(self, expenses, title):
+        """Met à jour le camembert sans vider l'axe ; les parts ne sont recréées que si les montants changent.
+
+        À appeler sous `canvas.render_lock`.
+        """
+        self.ax_pie.set_title(title if expenses else "")
+        if expenses == self.pie_expenses:
+            return
+        for artist in self.pie_artists:
+            artist.remove()
+        self.pie_artists = []
+        if expenses:
+            wedges, texts, autotexts = self.ax_pie.pie(expenses.values(), labels=expenses.keys(), autopct='%1.1f%%', startangle=90)
+            self.pie_artists = wedges + texts + autotexts
+        self.pie_empty_text.set_visible(not expenses)
+        self.pie_expenses = expenses
+
+    @traced('FinTrackApp._show_dashboard')
+    def _show_dashboard(self, rendered):
+        result, key, region = rendered
+        if key is not None:
+            self.dashboard_cache[key] = (result, region)
+            while len(self.dashboard_cache) > self.DASHBOARD_CACHE_SIZE:
+                del self.dashboard_cache[next(iter(self.dashboard_cache))]
+        months, income, expense, monthly_expenses_cat = result
+        today = datetime.date.today()
+        months = sorted(set(months) | {(today.year, today.month)}, reverse=True)
+        self.month_filter_cb.config(values=[f"{m:02d}-{y}" for y, m in months])
 
         self.total_income_label.config(text=f"Revenus: {income:.2f} €")
         self.total_expense_label.config(text=f"Dépenses: {expense:.2f} €")
         net = income - expense
         self.net_balance_label.config(text=f"Solde: {net:.2f} €", foreground="green" if net >= 0 else "red")
         
-        for widget in self.budget_frame.winfo_children(): widget.destroy()
-        row = 0
-        for category in self.categories:
+        for row, category in enumerate(self.categories):
             if category == 'Salaire': continue
             budget = self.budget_manager.get_budget(category)
-            if budget > 0:
-                expense_cat = monthly_expenses_cat.get(category, 0.0)
-                percent = (expense_cat / budget) * 100 if budget > 0 else 0
-                ttk.Label(self.budget_frame, text=f"{category}:").grid(row=row, column=0, sticky='w')
-                p_bar = ttk.Progressbar(self.budget_frame, length=200, value=percent, style="Budget.TProgressbar" if percent <= 100 else "Overbudget.TProgressbar")
-                p_bar.grid(row=row, column=1, padx=5, pady=2)
-                ttk.Label(self.budget_frame, text=f"{expense_cat:.2f}€ / {budget:.2f}€").grid(row=row, column=2, sticky='w')
-                row += 1
-
-        self.ax_pie.clear()
-        if monthly_expenses_cat:
-            self.ax_pie.pie(monthly_expenses_cat.values(), labels=monthly_expenses_cat.keys(), autopct='%1.1f%%', startangle=90)
-            self.ax_pie.set_title(f"Répartition des Dépenses ({selected_account})")
-        else:
-            self.ax_pie.text(0.5, 0.5, "Aucune dépense à afficher", ha="center", va="center")
-        self.canvas.draw()
+            widgets = self.budget_rows.get(category)
+            if budget <= 0:
+                # Ligne masquée mais conservée : grid() la remet en place telle quelle.
+                for widget in widgets or ():
+                    widget.grid_remove()
+                continue
+            if widgets is None:
+                widgets = self.budget_rows[category] = (
+                    ttk.Label(self.budget_frame, text=f"{category}:"),
+                    ttk.Progressbar(self.budget_frame, length=200),
+                    ttk.Label(self.budget_frame))
+                widgets[0].grid(row=row, column=0, sticky='w')
+                widgets[1].grid(row=row, column=1, padx=5, pady=2)
+                widgets[2].grid(row=row, column=2, sticky='w')
+            else:
+                for widget in widgets:
+                    widget.grid()
+            expense_cat = monthly_expenses_cat.get(category, 0.0)
+            percent = (expense_cat / budget) * 100
+            widgets[1].config(value=percent, style="Budget.TProgressbar" if percent <= 100 else "Overbudget.TProgressbar")
+            widgets[2].config(text=f"{expense_cat:.2f}€ / {budget:.2f}€")
+
+        self.canvas.blit()
         
     def open_budget_window(self):
         BudgetWindow(self)
 
+    def load_full_history(self):
+        """Charge toutes les années archivées (recherche, tris ou mois anciens)."""
+        if not self.transaction_manager.archived_years():
+            messagebox.showinfo("Historique", "Tout l'historique est déjà chargé.")
+            return
+        self.config(cursor="watch")
+        self.update_idletasks()
+        try:
+            loaded = self.transaction_manager.load_history()
+        finally:
+            self.config(cursor="")
+        self.refresh_treeview()
+        self.schedule_dashboard_update()
+        messagebox.showinfo("Historique", f"{len(loaded)} transaction(s) archivée(s) chargée(s).")
+
+    def open_diagnostics_window(self):
+        DiagnosticsWindow(self)
+
+    def import_csv(self):
+        path = filedialog.askopenfilename(title="Importer un relevé CSV",
+                                          filetypes=[("Fichiers CSV", "*.csv"), ("Tous les fichiers", "*.*")])
+        if not path: return
+        self.config(cursor="watch")
+        self.update_idletasks()
+        try:
+            importer = CsvImporter(self.transaction_manager, self.account_combobox.get() or "Compte Courant").run(path)
+        except (OSError, UnicodeDecodeError, csv.Error) as error:
+            messagebox.showerror("Erreur", f"Import impossible : {error}")
+            return
+        finally:
+            self.config(cursor="")
+        self.refresh_treeview()
+        self.update_dashboard()
+        report = (f"{importer.imported} transaction(s) importée(s), "
+                  f"{importer.duplicates} doublon(s) ignoré(s), {importer.error_count} ligne(s) invalide(s).")
+        if importer.errors:
+            report += "\n\n" + "\n".join(f"Ligne {line} : {reason}" for line, reason in importer.errors[:10])
+        messagebox.showinfo("Import CSV", report)
+
     def on_closing(self):
         if messagebox.askokcancel("Quitter", "Voulez-vous vraiment quitter ?"):
+            for name in ('account_manager', 'budget_manager', 'recurring_manager', 'transaction_manager'):
+                if name in self.__dict__:
+                    self.__dict__[name].close()
             self.destroy()
             
     def on_tab_changed(self, event=None):
-        if self.notebook.index(self.notebook.select()) == 1:
-            self.update_dashboard()
+        index = self.notebook.index(self.notebook.select())
+        if index == 1:
+            if self.canvas is None:
+                self.create_viz_widgets()
+            self.schedule_dashboard_update()
+        elif index == 2:
+            if self.trends_canvas is None:
+                # Les tendances portent sur plusieurs années : on charge les archives une fois pour toutes.
+                if self.transaction_manager.load_history():
+                    self.refresh_treeview()
+                self.create_trend_widgets()
+            self.schedule_trends_update()
+
+STARTUP_BENCHMARK_SIZE = 10_000
+STARTUP_TIMEOUT_S = 120
+
+def run_startup_benchmark(repeat, size=STARTUP_BENCHMARK_SIZE):
+    """Mesure le démarrage dans `repeat` processus neufs et affiche les médianes (JSON).
+
+    Chaque lancement part d'une copie d'un même dossier synthétique de `size`
+    transactions, jamais des données de l'utilisateur. Un premier lancement
+    non mesuré fait la migration en archives, l'instantané et le rattrapage
+    des récurrences : les lancements mesurés partent tous du même état.
+    """
+    # Imports différés : rien de tout cela ne sert au lancement normal.
+    import shutil
+    import tempfile
+    from benchmark import write_data_dir
+
+    def probe(data_dir):
+        try:
+            result = subprocess.run([sys.executable, os.path.abspath(__file__), "--startup-probe", "--data-dir", data_dir],
+                                    capture_output=True, text=True, check=True, timeout=STARTUP_TIMEOUT_S)
+        except subprocess.TimeoutExpired:
+            sys.exit(f"Le lancement n'a pas abouti en {STARTUP_TIMEOUT_S} s.")
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    with tempfile.TemporaryDirectory(prefix="fintrack-startup-") as root:
+        template = os.path.join(root, "template")
+        write_data_dir(template, size)
+        probe(template)
+        runs = []
+        for index in range(repeat):
+            data_dir = os.path.join(root, f"run{index}")
+            shutil.copytree(template, data_dir)
+            runs.append(probe(data_dir))
+    median = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+    print(json.dumps({'python': sys.version.split()[0], 'size': size, 'runs': runs, 'median': median}, indent=4))
+
+_MODULE_LOADED = time.perf_counter()
 
 # ==============================================================================
-# 5. LANCEUR DE L'APPLICATION (SIMPLIFIÉ)
+# 3. LANCEUR DE L'APPLICATION (SIMPLIFIÉ)
 # ==============================================================================
 if __name__ == "__main__":
-    app = FinTrackApp()
+    parser = argparse.ArgumentParser(description="FinTrack AI - Gestionnaire de Finances")
+    parser.add_argument("--startup-benchmark", type=int, nargs="?", const=5, metavar="N",
+                        help="mesure l'import et le temps jusqu'au premier affichage sur N lancements")
+    parser.add_argument("--startup-probe", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--data-dir", metavar="DOSSIER", help="dossier de données (défaut : fintrack_data)")
+    subparsers = parser.add_subparsers(dest="command")
+    add_report_arguments(subparsers.add_parser("report", help="rapports sans interface graphique (JSON)"))
+    args = parser.parse_args()
+
+    if args.command == "report":
+        sys.exit(run_report_cli(args))
+    if args.startup_benchmark:
+        run_startup_benchmark(args.startup_benchmark)
+        sys.exit()
+    app = FinTrackApp(args.data_dir, interactive=not args.startup_probe)
+    if args.startup_probe:
+        app.bind("<<StartupComplete>>", lambda event: (print(json.dumps(app.startup_times)), app.destroy()))
     app.mainloop()
\ No newline at end of file